@@ -1,30 +1,82 @@
-from flask import Flask, render_template, request, jsonify, session
+from flask import Flask, render_template, request, jsonify, session, Response, stream_with_context, g, has_request_context
 import csv
 import os
 from werkzeug.utils import secure_filename
+from werkzeug.datastructures import FileStorage
 import uuid
 from difflib import SequenceMatcher
 import re
-from collections import defaultdict
+from collections import defaultdict, Counter, OrderedDict, deque
 import logging
 from datetime import datetime
 import json
 import io
+import sys
+import codecs
+import hashlib
+import threading
+import time
+import tracemalloc
+import shutil
+import tempfile
+import sqlite3
+import queue
+import heapq
+import atexit
+import bisect
+import functools
+import copy
+import multiprocessing
+import mmap
+import struct
+import math
+from itertools import islice
+from array import array
+from collections.abc import Mapping
 
 app = Flask(__name__)
 app.secret_key = 'bootcode_verification_secret_key'
 app.config['UPLOAD_FOLDER'] = 'uploads'
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['MAX_CONTENT_LENGTH'] = 512 * 1024 * 1024  # 512MB max file size, uploads are streamed
+app.config['INGEST_CHUNK_ROWS'] = 5000  # Rows compiled per chunk while streaming an upload
+app.config['INGEST_TRACK_MEMORY'] = False  # Measure peak allocations with tracemalloc (slower)
+app.config['BATCH_MAX_MESSAGES'] = 5000  # Max messages accepted by /chat/batch
+app.config['TRIAGE_MAX_UNIQUE_LINES'] = 10000  # Max distinct log lines diagnosed per /triage-log
+app.config['RESULT_CACHE_SIZE'] = 1024  # Max cached match results
+app.config['RESULT_CACHE_TTL'] = 300  # Seconds before a cached result expires
+app.config['DATASET_SESSION_TTL'] = 3600  # Seconds before an idle session's dataset is released
+app.config['DATASET_MEMORY_BUDGET'] = 512 * 1024 * 1024  # 512MB for all resident datasets
+# 'memory' keeps sessions in this process; 'sqlite' shares them between worker processes
+app.config['STORAGE_BACKEND'] = os.environ.get('CHATBOT_STORAGE_BACKEND', 'memory')
+app.config['SQLITE_PATH'] = os.environ.get('CHATBOT_SQLITE_PATH', 'chatbot.db')
+app.config['UNMATCHED_RECENT_SIZE'] = 100  # Most recent unmatched errors kept verbatim
+app.config['UNMATCHED_MAX_GROUPS'] = 10000  # Distinct unmatched messages tracked in memory
+app.config['UNMATCHED_QUEUE_SIZE'] = 10000  # Pending unmatched errors before new ones are dropped
+app.config['UNMATCHED_BATCH_SIZE'] = 500  # Unmatched errors written per batch
+app.config['UNMATCHED_FLUSH_INTERVAL'] = 0.5  # Seconds the writer waits to fill a batch
+app.config['METRICS_ENABLED'] = True  # Collect stage latencies and counters for /metrics
+app.config['SERVER_TIMING'] = False  # Send Server-Timing on every response, not only when asked for
+app.config['PARALLEL_MATCH_WORKERS'] = os.cpu_count() or 1  # Matching processes for large datasets (1 disables)
+app.config['PARALLEL_MATCH_MIN_ROWS'] = 200000  # Datasets at least this large are matched in parallel
+app.config['DATASET_EDIT_MAX_ROWS'] = 10000  # Rows accepted per append/edit request
+app.config['FOLLOW_UP_TTL'] = 600  # Seconds a follow-up question's shortlist stays answerable
+app.config['FOLLOW_UP_MAX_CONTEXTS'] = 10000  # Sessions with a pending follow-up kept in memory
+app.config['MATCH_EXHAUSTIVE_MAX_ROWS'] = 1000  # Datasets up to this size score every row; larger ones a trigram shortlist
+app.config['MATCH_INDEX_FREQUENT_GRAM_SHARE'] = 0.5  # Trigrams in more than this share of rows do not select candidates
+app.config['MATCH_TIME_BUDGET'] = 2.0  # Seconds a matching pass may take before best-so-far results are returned (None disables)
+app.config['MATCH_SCORER'] = os.environ.get('CHATBOT_MATCH_SCORER', 'difflib')  # 'difflib' or 'tfidf' (needs NumPy)
+app.config['TFIDF_PATCH_MAX_SHARE'] = 0.1  # Edited rows, as a share of the dataset, before the TF-IDF model is rebuilt
+app.config['CATALOG_DIR'] = os.environ.get('CHATBOT_CATALOG_DIR')  # CSV/Excel catalogs preloaded at startup, named by file
+app.config['CATALOG_ARTIFACT_DIR'] = os.environ.get('CHATBOT_CATALOG_ARTIFACT_DIR')  # Compiled catalogs; default <CATALOG_DIR>/.compiled
+app.config['KEYWORD_VOCABULARY'] = []  # Extra terms recognized by extract_keywords
+app.config['CATEGORY_KEYWORDS'] = {}  # Extra category -> terms rules, e.g. {'network': ['pxe', 'tftp']}
 
 # Create uploads directory if it doesn't exist
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
-# Store uploaded data in memory (in production, use a database)
-uploaded_data = {}
-# Store conversation context for follow-up questions
-conversation_context = {}
-# Store unmatched errors for dataset improvement
-unmatched_errors = []
+# Store conversation context for follow-up questions: session_id -> (time stored, context),
+# least recently stored first
+conversation_context = OrderedDict()
 
 # Setup logging for unmatched errors
 logging.basicConfig(
@@ -37,6 +89,225 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class Histogram:
+    """Cumulative-bucket histogram rendered in Prometheus text format"""
+
+    BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for bucket_idx, bound in enumerate(self.BUCKETS):
+            if value <= bound:
+                break
+        else:
+            bucket_idx = len(self.BUCKETS)
+        self.counts[bucket_idx] += 1
+        self.total += value
+        self.count += 1
+
+class Metrics:
+    """Process-wide counters and stage latency histograms"""
+
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.stages = defaultdict(Histogram)
+        self.counters = defaultdict(float)  # (name, labels) -> value
+        self.help = {}
+        self.gauges = []  # callables returning [(name, help, value)]
+
+    def observe_stage(self, stage, seconds):
+        with self.lock:
+            self.stages[stage].observe(seconds)
+        # Per-request breakdown for the Server-Timing header
+        if has_request_context() and 'server_timing' in g:
+            g.server_timing.append((stage, seconds))
+
+    def inc(self, name, value=1, help_text='', **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] += value
+            self.help.setdefault(name, help_text)
+
+    def render(self):
+        """Render every metric in the Prometheus text exposition format"""
+        lines = ['# HELP chatbot_stage_seconds Latency of request pipeline stages',
+                 '# TYPE chatbot_stage_seconds histogram']
+        with self.lock:
+            for stage, histogram in sorted(self.stages.items()):
+                cumulative = 0
+                for bound, count in zip(Histogram.BUCKETS + ('+Inf',), histogram.counts):
+                    cumulative += count
+                    lines.append(f'chatbot_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'chatbot_stage_seconds_sum{{stage="{stage}"}} {histogram.total}')
+                lines.append(f'chatbot_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+            
+            counters = defaultdict(list)
+            for (name, labels), value in self.counters.items():
+                counters[name].append((labels, value))
+            for name in sorted(counters):
+                lines.append(f'# HELP {name} {self.help.get(name, "")}')
+                lines.append(f'# TYPE {name} counter')
+                for labels, value in sorted(counters[name]):
+                    label_text = ','.join(f'{key}="{label}"' for key, label in labels)
+                    lines.append(f'{name}{{{label_text}}} {value:g}' if label_text else f'{name} {value:g}')
+        
+        for gauge in self.gauges:
+            for name, help_text, value in gauge():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} gauge')
+                lines.append(f'{name} {value:g}')
+        return '\n'.join(lines) + '\n'
+
+metrics = Metrics(app.config['METRICS_ENABLED'])
+
+def instrumented(stage):
+    """Record a function's latency as a pipeline stage when metrics are enabled"""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return function(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                metrics.observe_stage(stage, time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+class ResultCache:
+    """Size- and TTL-bounded LRU cache of match results per dataset and query"""
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                if entry is not None:
+                    del self.entries[key]
+                    self.evictions += 1
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic(), value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def migrate(self, fingerprint, new_fingerprint, still_valid):
+        """Carry results over to an edited dataset where still_valid(key, value) holds"""
+        with self.lock:
+            for key, (created, value) in list(self.entries.items()):
+                if key[0] == fingerprint and still_valid(key, value):
+                    self.entries[(new_fingerprint,) + key[1:]] = (created, value)
+
+    def invalidate(self, fingerprint):
+        """Drop every cached result computed against a dataset"""
+        with self.lock:
+            for key in [key for key in self.entries if key[0] == fingerprint]:
+                del self.entries[key]
+
+    def stats(self):
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+# Cache of find_best_matches/follow-up results shared by all sessions
+result_cache = ResultCache(app.config['RESULT_CACHE_SIZE'], app.config['RESULT_CACHE_TTL'])
+
+def normalize_unmatched(error_message):
+    """Key used to group repeated unmatched errors"""
+    return ' '.join(error_message.lower().split())
+
+class UnmatchedAggregator:
+    """Unmatched errors grouped by normalized text, plus a ring buffer of recent ones"""
+
+    def __init__(self, recent_size, max_groups):
+        self.recent = deque(maxlen=recent_size)
+        self.max_groups = max_groups
+        self.groups = {}
+        self.total = 0
+        self.lock = threading.Lock()
+
+    def add_batch(self, error_entries):
+        with self.lock:
+            for error_entry in error_entries:
+                self.recent.append(error_entry)
+                self.total += 1
+                key = normalize_unmatched(error_entry['error_message'])
+                group = self.groups.get(key)
+                if group is None:
+                    group = self.groups[key] = {
+                        'error_message': error_entry['error_message'],
+                        'count': 0,
+                        'first_seen': error_entry['timestamp'],
+                        'last_seen': error_entry['timestamp'],
+                        'sessions': set()
+                    }
+                group['count'] += 1
+                group['last_seen'] = max(group['last_seen'], error_entry['timestamp'])
+                group['sessions'].add(error_entry['session_id'])
+            if len(self.groups) > self.max_groups:
+                # Forget the rarest, stalest tenth of the groups
+                for key in heapq.nsmallest(len(self.groups) // 10, self.groups,
+                                           key=lambda key: (self.groups[key]['count'], self.groups[key]['last_seen'])):
+                    del self.groups[key]
+
+    def top(self, limit=None):
+        """Most frequent unmatched errors first"""
+        with self.lock:
+            groups = list(self.groups.values())
+        ranked = sorted(groups, key=lambda group: (group['count'], group['last_seen']), reverse=True)
+        return [
+            {
+                'error_message': group['error_message'],
+                'count': group['count'],
+                'first_seen': group['first_seen'],
+                'last_seen': group['last_seen'],
+                'session_count': len(group['sessions'])
+            }
+            for group in (ranked[:limit] if limit else ranked)
+        ]
+
+    def recent_entries(self, limit=None):
+        with self.lock:
+            entries = list(self.recent)
+        return entries[-limit:] if limit else entries
+
+    def stats(self):
+        with self.lock:
+            return {'total_count': self.total, 'distinct_count': len(self.groups)}
+
+# Store unmatched errors for dataset improvement
+unmatched_errors = UnmatchedAggregator(app.config['UNMATCHED_RECENT_SIZE'], app.config['UNMATCHED_MAX_GROUPS'])
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in {'csv', 'xls', 'xlsx'}
 
@@ -44,23 +315,1146 @@ def similarity(a, b):
     """Calculate similarity between two strings"""
     return SequenceMatcher(None, a.lower(), b.lower()).ratio()
 
-def extract_keywords(text):
-    """Extract meaningful keywords from error message"""
-    # Common bootcode-related keywords
-    keywords = []
-    text_lower = text.lower()
+def trigrams(text):
+    """Return the set of character trigrams in a string"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def copy_array(typecode, values):
+    """Copy an array, or a memoryview over a compiled catalog, into a new growable array"""
+    copied = array(typecode)
+    copied.frombytes(values.tobytes())
+    return copied
+
+def length_within_bounds(query_length, stored_length, threshold):
+    """Check whether two lengths can still reach the similarity threshold"""
+    # ratio = 2 * matches / (len_a + len_b) and matches <= min(len_a, len_b)
+    if threshold <= 0:
+        return True
+    return 2 * min(query_length, stored_length) >= threshold * (query_length + stored_length)
+
+INDEX_CHUNK_ROWS = 4096  # Rows looked up or ordered between checks of a matching deadline
+
+class Candidates(list):
+    """Rows worth scoring for a query, with the share of the index lookup done before the time budget ran out"""
+
+    def __init__(self, rows=(), complete=1.0):
+        super().__init__(rows)
+        self.complete = complete
+
+class MatchIndex:
+    """Character trigram postings over the error column, built once per upload"""
+
+    def __init__(self, errors_lower=()):
+        self.postings = {}  # trigram -> array of row indexes
+        self.lengths = array('I')
+        self.gram_counts = array('I')
+        self.short_rows = []  # Rows without any trigram are always checked
+        self.fewest_grams = None  # Fewest trigrams of a row that has any; edits may leave it low
+        self.removed = set()  # Deleted rows, never returned as candidates
+        self.owned = None  # Trigrams whose postings this index may append to; None means all
+        self.nbytes = 0
+
+        for stored_error in errors_lower:
+            self.add(stored_error)
+
+    def add(self, stored_error):
+        """Index the next row's lower-cased error message"""
+        row_idx = len(self.lengths)
+        grams = trigrams(stored_error)
+        self.lengths.append(len(stored_error))
+        self.gram_counts.append(len(grams))
+        self.nbytes += 8
+        if not grams:
+            self.short_rows.append(row_idx)
+        elif self.fewest_grams is None or len(grams) < self.fewest_grams:
+            self.fewest_grams = len(grams)
+        self.add_postings(row_idx, grams)
+
+    def add_postings(self, row_idx, grams):
+        self.nbytes += 4 * len(grams)
+        for gram in grams:
+            postings = self.postings.get(gram)
+            if postings is None:
+                postings = self.postings[gram] = array('I')
+                self.nbytes += sys.getsizeof(gram) + sys.getsizeof(postings) + 32
+                if self.owned is not None:
+                    self.owned.add(gram)
+            elif self.owned is not None and gram not in self.owned:
+                # Postings shared with a copy are copied on the first write
+                postings = self.postings[gram] = copy_array('I', postings)
+                self.owned.add(gram)
+            postings.append(row_idx)
+
+    def update(self, row_idx, old_error, stored_error):
+        """Re-index an edited row in place"""
+        grams = trigrams(stored_error)
+        self.lengths[row_idx] = len(stored_error)
+        self.gram_counts[row_idx] = len(grams)
+        if not grams and row_idx not in self.short_rows:
+            self.short_rows.append(row_idx)
+        elif grams and (self.fewest_grams is None or len(grams) < self.fewest_grams):
+            self.fewest_grams = len(grams)
+        # Postings of trigrams the row no longer has are left behind: they only
+        # add candidates, which are scored against the current text anyway
+        self.add_postings(row_idx, grams - trigrams(old_error))
+
+    def remove(self, row_idx):
+        self.removed.add(row_idx)
+
+    def copy(self):
+        """Independent copy for copy-on-write edits of a shared dataset"""
+        clone = copy.copy(self)
+        # Both sides share the posting arrays until they append to them
+        clone.postings = dict(self.postings)
+        clone.owned = set()
+        self.owned = set()
+        clone.lengths = copy_array('I', self.lengths)
+        clone.gram_counts = copy_array('I', self.gram_counts)
+        clone.short_rows = list(self.short_rows)
+        clone.removed = set(self.removed)
+        return clone
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def shared_counts(self, query_grams, deadline=None, min_shared=1):
+        """Count the query trigrams each row contains, for rows sharing at least one, and
+        return the counts with the share of postings walked before `deadline`; rows sharing
+        fewer than `min_shared` may be left out"""
+        shared = Counter()
+        postings = sorted((self.postings.get(gram, ()) for gram in query_grams), key=len)
+        total = sum(map(len, postings))
+        walked = 0
+        # Rarer trigrams first, in chunks, so a lookup cut short by the deadline has the most telling counts
+        for rows in postings:
+            for start in range(0, len(rows), INDEX_CHUNK_ROWS):
+                if deadline is not None and walked and time.perf_counter() >= deadline:
+                    return shared, walked / total
+                chunk = rows[start:start + INDEX_CHUNK_ROWS]
+                shared.update(chunk)
+                walked += len(chunk)
+        return shared, 1.0
+
+    def shortlists(self, error_message_lower, threshold):
+        """Whether candidates() narrows this query down to a trigram shortlist rather than every row"""
+        return threshold > 0 and len(self) > app.config['MATCH_EXHAUSTIVE_MAX_ROWS'] and bool(trigrams(error_message_lower))
+
+    def candidates(self, error_message_lower, threshold, deadline=None, exhaustive=False):
+        """Return the row indexes worth scoring for a query, in row order; a lookup cut short
+        by `deadline` returns the rows found so far, with `complete` below 1"""
+        if exhaustive or not self.shortlists(error_message_lower, threshold):
+            return Candidates(row_idx for row_idx in range(len(self)) if row_idx not in self.removed)
+        query_grams = trigrams(error_message_lower)
+
+        # Trigrams most rows contain ("err", "ror") would put every row on the
+        # shortlist; rows are looked up through the query's rarer trigrams only
+        frequent_rows = app.config['MATCH_INDEX_FREQUENT_GRAM_SHARE'] * len(self)
+        frequencies = self.gram_frequencies(query_grams)
+        informative = {gram for gram in query_grams if frequencies.get(gram, 0) <= frequent_rows}
+        if not informative:
+            informative = query_grams
+        frequent = len(query_grams) - len(informative)
+
+        # Rows must reach a trigram Dice overlap tied to the threshold (rows with a
+        # difflib ratio of t keep about t - 0.3 in practice), counting the frequent
+        # query trigrams as shared so the estimate errs high
+        min_overlap = max(threshold - 0.3, 0)
+        query_length = len(error_message_lower)
+        # No row with fewer shared trigrams can pass the tests below, whatever its own count
+        fewest = self.fewest_grams or 1
+        min_shared = max(1, min(len(informative), fewest - frequent,
+                                math.ceil(min_overlap * (len(query_grams) + fewest) / 2) - frequent))
+        shared, complete = self.shared_counts(informative, deadline, min_shared)
+
+        candidates = set(self.short_rows)
+        for position, (row_idx, count) in enumerate(shared.items()):
+            if deadline is not None and position and not position % INDEX_CHUNK_ROWS and time.perf_counter() >= deadline:
+                complete *= position / len(shared)
+                break
+            possible = count + frequent
+            # Substring matches share every trigram of the shorter string (counts
+            # can run high after edits leave stale postings, never low)
+            if count >= len(informative):
+                candidates.add(row_idx)
+            elif self.lengths[row_idx] <= query_length and possible >= self.gram_counts[row_idx]:
+                candidates.add(row_idx)
+            elif (length_within_bounds(query_length, self.lengths[row_idx], threshold)
+                  and 2 * possible >= min_overlap * (len(query_grams) + self.gram_counts[row_idx])):
+                candidates.add(row_idx)
+        return Candidates(sorted(candidates - self.removed) if self.removed else sorted(candidates), complete)
+
+    def gram_frequencies(self, query_grams):
+        """Number of rows holding each query trigram, counting stale postings"""
+        return {gram: len(self.postings.get(gram, ())) for gram in query_grams}
+
+# Column names recognised for each fix role (compared lower-cased)
+PRIORITY_COLUMNS = ['priority', 'priority_level', 'urgency']
+PRIMARY_FIX_COLUMNS = ['primary_fix', 'main_fix', 'fix', 'solution']
+ALTERNATIVE_FIX_COLUMNS = ['secondary_fix', 'alternative_fix', 'alt_fix', 'alternative']
+ADDITIONAL_FIX_COLUMNS = ['tertiary_fix', 'additional_fix', 'extra_fix']
+PRIORITY_ORDER = {'High': 3, 'Medium': 2, 'Low': 1, 'Critical': 4, 'Urgent': 4}
+EMPTY_VALUES = ['nan', 'none', '', 'null']
+
+# Common bootcode-related keywords, in the order extract_keywords reports them
+BOOT_TERMS = ['boot', 'bios', 'uefi', 'mbr', 'gpt', 'bootloader', 'grub', 'ntldr', 'bootmgr']
+HARDWARE_TERMS = ['memory', 'ram', 'cpu', 'disk', 'drive', 'ssd', 'hdd', 'tpm', 'secure']
+ERROR_TERMS = ['error', 'failure', 'failed', 'missing', 'corrupt', 'invalid', 'timeout', 'panic']
+
+# Categories in precedence order; the first category with a keyword present wins
+CATEGORY_RULES = [
+    ('memory', ['memory', 'ram']),
+    ('storage', ['disk', 'drive', 'ssd', 'hdd', 'mbr', 'gpt']),
+    ('bootloader', ['boot', 'bootloader', 'grub', 'ntldr', 'bootmgr']),
+    ('firmware', ['bios', 'uefi', 'tpm', 'secure']),
+    ('processor', ['cpu'])
+]
+
+class KeywordMatcher:
+    """Finds every vocabulary term in a text with one compiled regex pass"""
+
+    def __init__(self, terms, category_rules):
+        self.terms = list(dict.fromkeys(term.lower() for term in terms))
+        self.order = {term: term_idx for term_idx, term in enumerate(self.terms)}
+        # A lookahead reports the longest term starting at each position; the
+        # shorter terms inside it are implied, so substring semantics are kept
+        self.pattern = re.compile('(?=(' + '|'.join(
+            re.escape(term) for term in sorted(self.terms, key=len, reverse=True)) + '))')
+        self.implied = {term: [other for other in self.terms if other in term] for term in self.terms}
+        self.category_rules = [(category, frozenset(term.lower() for term in category_terms))
+                               for category, category_terms in category_rules]
+
+    def extract(self, text):
+        """Return the vocabulary terms found in text, in vocabulary order"""
+        found = set()
+        for longest in set(self.pattern.findall(text.lower())):
+            found.update(self.implied[longest])
+        return sorted(found, key=self.order.__getitem__)
+
+    def categorize(self, keywords):
+        for category, category_terms in self.category_rules:
+            if not category_terms.isdisjoint(keywords):
+                return category
+        return 'general'
+
+_keyword_matcher = None
+
+def keyword_matcher():
+    """Build the keyword matcher from the default and configured vocabulary on first use"""
+    global _keyword_matcher
+    if _keyword_matcher is None:
+        category_rules = [(category, list(category_terms)) for category, category_terms in CATEGORY_RULES]
+        known = dict(category_rules)
+        for category, category_terms in app.config['CATEGORY_KEYWORDS'].items():
+            if category in known:
+                known[category].extend(category_terms)
+            else:
+                category_rules.append((category, list(category_terms)))
+        
+        terms = BOOT_TERMS + HARDWARE_TERMS + ERROR_TERMS + list(app.config['KEYWORD_VOCABULARY'])
+        terms += [term for _, category_terms in category_rules for term in category_terms]
+        _keyword_matcher = KeywordMatcher(terms, category_rules)
+    return _keyword_matcher
+
+def classify_columns(columns):
+    """Map every column after the error column to its fix type or priority role"""
+    roles = []
+    for col_idx, col_name in enumerate(columns[1:], 1):
+        col_lower = str(col_name).lower()
+        if col_lower in PRIORITY_COLUMNS:
+            roles.append((col_name, None, False))
+        elif col_lower in PRIMARY_FIX_COLUMNS:
+            roles.append((col_name, 'Primary', True))
+        elif col_lower in ALTERNATIVE_FIX_COLUMNS:
+            roles.append((col_name, 'Alternative', False))
+        elif col_lower in ADDITIONAL_FIX_COLUMNS:
+            roles.append((col_name, 'Additional', False))
+        # Auto-detect fix type based on column position
+        elif col_idx == 1:
+            roles.append((col_name, 'Primary', True))
+        elif col_idx == 2:
+            roles.append((col_name, 'Alternative', False))
+        elif col_idx == 3:
+            roles.append((col_name, 'Additional', False))
+        else:
+            roles.append((col_name, f'Option {col_idx-1}', False))
+    return roles
+
+def build_fixes(row, column_roles):
+    """Collect the fix list and priority of a single row"""
+    fixes = []
+    priority = "Medium"  # Default priority
     
-    # Boot-related terms
-    boot_terms = ['boot', 'bios', 'uefi', 'mbr', 'gpt', 'bootloader', 'grub', 'ntldr', 'bootmgr']
-    hardware_terms = ['memory', 'ram', 'cpu', 'disk', 'drive', 'ssd', 'hdd', 'tpm', 'secure']
-    error_terms = ['error', 'failure', 'failed', 'missing', 'corrupt', 'invalid', 'timeout', 'panic']
+    for col_name, fix_type, insert_first in column_roles:
+        if col_name in row:
+            col_value = str(row[col_name]).strip()
+            
+            # Skip empty/null values
+            if col_value and col_value.lower() not in EMPTY_VALUES:
+                if fix_type is None:
+                    priority = col_value
+                elif insert_first:
+                    fixes.insert(0, {'type': fix_type, 'content': col_value})
+                else:
+                    fixes.append({'type': fix_type, 'content': col_value})
     
-    for term in boot_terms + hardware_terms + error_terms:
-        if term in text_lower:
-            keywords.append(term)
+    # Ensure we have at least one fix
+    if not fixes:
+        fixes = [{'type': 'Primary', 'content': 'No specific fix provided'}]
     
-    return keywords
+    return fixes, priority
+
+# Placeholder for cells absent from a row (e.g. short Excel rows)
+MISSING = object()
+
+class ValueTable:
+    """Deduplicated cell values shared by all columns of a dataset"""
+
+    def __init__(self):
+        self.values = [MISSING]
+        self.ids = {(object, MISSING): 0}
+        self.nbytes = 0
+        self.lock = threading.Lock()  # Copies of an edited dataset keep sharing the table
+
+    def add(self, value):
+        """Return the id of a value, storing it on first sight"""
+        # Strings never compare equal to other types; 1, 1.0 and True must stay distinct
+        key = value if type(value) is str else (type(value), value)
+        value_id = self.ids.get(key)
+        if value_id is None:
+            with self.lock:
+                value_id = self.ids.get(key)
+                if value_id is None:
+                    value_id = self.store(key, value)
+        return value_id
+
+    def store(self, key, value):
+        if isinstance(value, str):
+            value = sys.intern(value)
+        # The value goes in before its id, as lookups run without the lock
+        value_id = len(self.values)
+        self.values.append(value)
+        self.ids[key] = value_id
+        self.nbytes += sys.getsizeof(value) + 50  # list slot plus dict entry
+        if isinstance(value, tuple):
+            for item in value:
+                self.nbytes += sys.getsizeof(item)
+                if isinstance(item, tuple):
+                    self.nbytes += sum(sys.getsizeof(part) for part in item)
+        return value_id
+
+class ValueColumn:
+    """One column of a dataset, stored as an array of value ids"""
+
+    __slots__ = ('table', 'ids')
+
+    def __init__(self, table):
+        self.table = table
+        self.ids = array('I')
+
+    def append(self, value):
+        self.ids.append(self.table.add(value))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, row_idx):
+        return self.table.values[self.ids[row_idx]]
+
+    def __setitem__(self, row_idx, value):
+        self.ids[row_idx] = self.table.add(value)
+
+    def __iter__(self):
+        values = self.table.values
+        return (values[value_id] for value_id in self.ids)
+
+    def copy(self):
+        # The value table is append-only, so copies can keep sharing it
+        clone = ValueColumn(self.table)
+        clone.ids = copy_array('I', self.ids)
+        return clone
+
+class RowView(Mapping):
+    """Read-only dict-like view of one dataset row"""
+
+    __slots__ = ('dataset', 'row_idx')
+
+    def __init__(self, dataset, row_idx):
+        self.dataset = dataset
+        self.row_idx = row_idx
+
+    def __getitem__(self, key):
+        column = self.dataset.column_index.get(key)
+        value = MISSING if column is None else self.dataset.cells[column][self.row_idx]
+        if value is MISSING:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self):
+        for col_name, column in zip(self.dataset.columns, self.dataset.cells):
+            if column[self.row_idx] is not MISSING:
+                yield col_name
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def to_dict(self):
+        """Materialize the row as a plain dict, e.g. for JSON responses"""
+        return {col_name: value for col_name, column in zip(self.dataset.columns, self.dataset.cells)
+                for value in (column[self.row_idx],) if value is not MISSING}
+
+    def __repr__(self):
+        return f"RowView({self.to_dict()!r})"
+
+class CompiledDataset:
+    """Query-independent, columnar form of an uploaded dataset, built once per upload"""
+
+    def __init__(self, data=None, columns=None, index=None):
+        # Get column names (first column is error messages)
+        if columns is None:
+            columns = list(data[0].keys()) if data else []
+        self.columns = list(columns)
+        self.column_index = {col_name: col_idx for col_idx, col_name in enumerate(self.columns)}
+        self.error_col = self.columns[0] if self.columns else None
+        self.column_roles = classify_columns(self.columns)
+
+        # Cells, fix lists and priorities all dedupe through one value table
+        self.table = ValueTable()
+        self.cells = [ValueColumn(self.table) for _ in self.columns]
+        self.errors = self.cells[0] if self.cells else ValueColumn(self.table)
+        self.errors_lower = ValueColumn(self.table)
+        self.fix_sets = ValueColumn(self.table)
+        self.priorities = ValueColumn(self.table)
+        self.priority_ranks = array('b')
+        # Keywords and category are query-independent, so they are worked out once per row
+        self.keywords = ValueColumn(self.table)
+        self.categories = ValueColumn(self.table)
+        self.deleted = set()  # Row ids stay stable, so deleted rows are tombstoned
+        self.scorer_models = {}  # scorer name -> (fingerprint it was built for, model)
+        self.index = index if index is not None else MatchIndex()
+        # Content hash used to share identical uploads and their cached results
+        self.content_hash = hashlib.sha256('\x1f'.join(map(str, self.columns)).encode('utf-8'))
+        self.fingerprint = self.content_hash.hexdigest()
+        self.ingest_stats = None
+
+        self.extend(data or [])
+
+    @property
+    def nbytes(self):
+        """Estimated resident size of the dataset and its index"""
+        row_bytes = len(self) * (4 * (len(self.cells) + 5) + 1)
+        model_bytes = sum(getattr(model, 'nbytes', 0) for _, model in self.scorer_models.values())
+        return self.table.nbytes + row_bytes + self.index.nbytes + model_bytes
+
+    @property
+    def live_rows(self):
+        return len(self) - len(self.deleted)
+
+    def compile_row(self, row, matcher):
+        """Work out the query-independent fields of a row"""
+        error_lower = str(row.get(self.error_col, '')).lower()
+        fixes, priority = build_fixes(row, self.column_roles)
+        keywords = tuple(matcher.extract(error_lower))
+        return (error_lower, tuple((fix['type'], fix['content']) for fix in fixes), priority,
+                PRIORITY_ORDER.get(priority, 2), keywords, matcher.categorize(keywords))
+
+    def row_digest(self, row):
+        return '\x1f'.join(str(row.get(col, '')) for col in self.columns)
+
+    def extend(self, rows):
+        """Compile a chunk of rows and append them to the dataset"""
+        matcher = keyword_matcher()
+        for row in rows:
+            self.content_hash.update(('\x1e' + self.row_digest(row)).encode('utf-8'))
+            for col_name, column in zip(self.columns, self.cells):
+                column.append(row.get(col_name, MISSING))
+            if not self.cells:
+                self.errors.append('')
+            error_lower, fix_set, priority, priority_rank, keywords, category = self.compile_row(row, matcher)
+            self.errors_lower.append(error_lower)
+            self.fix_sets.append(fix_set)
+            self.priorities.append(priority)
+            self.priority_ranks.append(priority_rank)
+            self.keywords.append(keywords)
+            self.categories.append(category)
+            self.index.add(error_lower)
+        self.fingerprint = self.content_hash.hexdigest()
+
+    def update_row(self, row_idx, row):
+        """Replace a row in place, keeping its row id"""
+        # Edits are chained into the content hash, so equal edit histories share a fingerprint
+        self.content_hash.update(('\x1d' + str(row_idx) + '\x1f' + self.row_digest(row)).encode('utf-8'))
+        for col_name, column in zip(self.columns, self.cells):
+            column[row_idx] = row.get(col_name, MISSING)
+        old_error = self.errors_lower[row_idx]
+        error_lower, fix_set, priority, priority_rank, keywords, category = self.compile_row(row, keyword_matcher())
+        self.errors_lower[row_idx] = error_lower
+        self.fix_sets[row_idx] = fix_set
+        self.priorities[row_idx] = priority
+        self.priority_ranks[row_idx] = priority_rank
+        self.keywords[row_idx] = keywords
+        self.categories[row_idx] = category
+        self.index.update(row_idx, old_error, error_lower)
+        self.fingerprint = self.content_hash.hexdigest()
+
+    def delete_row(self, row_idx):
+        self.content_hash.update(('\x1c' + str(row_idx)).encode('utf-8'))
+        self.deleted.add(row_idx)
+        self.index.remove(row_idx)
+        self.fingerprint = self.content_hash.hexdigest()
+
+    def copy(self):
+        """Independent copy for editing a dataset other sessions still use"""
+        clone = copy.copy(self)
+        clone.cells = [column.copy() for column in self.cells]
+        clone.errors = clone.cells[0] if clone.cells else self.errors.copy()
+        for name in ('errors_lower', 'fix_sets', 'priorities', 'keywords', 'categories'):
+            setattr(clone, name, getattr(self, name).copy())
+        clone.priority_ranks = copy_array('b', self.priority_ranks)
+        clone.deleted = set(self.deleted)
+        clone.index = self.index.copy()
+        clone.content_hash = self.content_hash.copy()
+        # Models are patched for the edit rather than rebuilt, see TfidfScorer.edited
+        clone.scorer_models = dict(self.scorer_models)
+        return clone
+
+    def __len__(self):
+        return len(self.errors_lower)
+
+    def __iter__(self):
+        return (RowView(self, row_idx) for row_idx in range(len(self)))
 
+    def __getitem__(self, item):
+        # Slices are materialized for JSON previews such as /upload's sample_data
+        if isinstance(item, slice):
+            return [RowView(self, row_idx).to_dict() for row_idx in range(len(self))[item]]
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError('dataset row index out of range')
+        return RowView(self, item)
+
+    def match(self, row_idx, similarity_score):
+        """Build the match record returned to the client for a row"""
+        error = self.errors[row_idx]
+        return {
+            'row_id': row_idx,
+            'error': '' if error is MISSING else error,
+            'fixes': [{'type': fix_type, 'content': content} for fix_type, content in self.fix_sets[row_idx]],
+            'priority': self.priorities[row_idx],
+            'category': self.categories[row_idx],
+            'similarity': similarity_score
+        }
+
+class DatasetStore:
+    """Content-addressed, refcounted store of compiled datasets shared by sessions"""
+
+    def __init__(self, session_ttl, memory_budget, on_release=None):
+        self.session_ttl = session_ttl
+        self.memory_budget = memory_budget
+        self.on_release = on_release
+        self.datasets = OrderedDict()  # fingerprint -> dataset, least recently used first
+        self.refcounts = {}
+        self.sessions = {}  # session_id -> [fingerprint, last access time]
+        self.pinned = set()  # Preloaded catalogs, kept without sessions and never evicted
+        self.lock = threading.RLock()
+        self.evictions = 0
+        self.expired_sessions = 0
+
+    def lookup(self, fingerprint):
+        """Return the resident dataset with this content, if any"""
+        with self.lock:
+            return self.datasets.get(fingerprint)
+
+    def attach(self, session_id, dataset):
+        """Point a session at a dataset, sharing an identical resident copy"""
+        with self.lock:
+            self.expire_idle()
+            fingerprint = dataset.fingerprint
+            if fingerprint not in self.datasets:
+                self.datasets[fingerprint] = dataset
+                self.refcounts[fingerprint] = 0
+            self.datasets.move_to_end(fingerprint)
+            # Take the new reference first so re-attaching the same dataset never drops it
+            self.refcounts[fingerprint] += 1
+            self.detach(session_id)
+            self.sessions[session_id] = [fingerprint, time.monotonic()]
+            self.enforce_budget(keep=fingerprint)
+            return self.datasets[fingerprint]
+
+    def get(self, session_id):
+        """Return the session's dataset and mark it as recently used"""
+        with self.lock:
+            entry = self.sessions.get(session_id)
+            if entry is None:
+                return None
+            now = time.monotonic()
+            if now - entry[1] > self.session_ttl:
+                self.detach(session_id)
+                self.expired_sessions += 1
+                return None
+            entry[1] = now
+            self.datasets.move_to_end(entry[0])
+            return self.datasets[entry[0]]
+
+    def detach(self, session_id):
+        """Release a session's reference, dropping datasets nobody uses"""
+        with self.lock:
+            entry = self.sessions.pop(session_id, None)
+            if entry is None:
+                return
+            fingerprint = entry[0]
+            self.refcounts[fingerprint] -= 1
+            if self.refcounts[fingerprint] <= 0 and fingerprint not in self.pinned:
+                self.drop(fingerprint)
+
+    def drop(self, fingerprint):
+        with self.lock:
+            self.datasets.pop(fingerprint, None)
+            self.refcounts.pop(fingerprint, None)
+            if self.on_release:
+                self.on_release(fingerprint)
+
+    def expire_idle(self):
+        """Release datasets of sessions idle for longer than the TTL"""
+        with self.lock:
+            now = time.monotonic()
+            for session_id, (_, last_seen) in list(self.sessions.items()):
+                if now - last_seen > self.session_ttl:
+                    self.detach(session_id)
+                    self.expired_sessions += 1
+
+    def pin(self, dataset):
+        """Keep a dataset resident for sessions to attach to, returning the resident copy"""
+        with self.lock:
+            fingerprint = dataset.fingerprint
+            self.datasets.setdefault(fingerprint, dataset)
+            self.refcounts.setdefault(fingerprint, 0)
+            self.pinned.add(fingerprint)
+            return self.datasets[fingerprint]
+
+    def is_shared(self, fingerprint):
+        """Whether a resident dataset is pinned or used by more than one session"""
+        with self.lock:
+            return fingerprint in self.pinned or self.refcounts.get(fingerprint, 0) > 1
+
+    def resident_bytes(self):
+        return sum(dataset.nbytes for dataset in self.datasets.values())
+
+    def enforce_budget(self, keep=None):
+        """Evict least recently used datasets until under the memory budget"""
+        with self.lock:
+            while self.resident_bytes() > self.memory_budget:
+                victim = next((fp for fp in self.datasets if fp != keep and fp not in self.pinned), None)
+                if victim is None:
+                    break
+                for session_id in [sid for sid, entry in self.sessions.items() if entry[0] == victim]:
+                    del self.sessions[session_id]
+                self.drop(victim)
+                self.evictions += 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                'resident_datasets': len(self.datasets),
+                'sessions': len(self.sessions),
+                'resident_bytes': self.resident_bytes(),
+                'memory_budget_bytes': self.memory_budget,
+                'evictions': self.evictions,
+                'expired_sessions': self.expired_sessions,
+                'datasets': [
+                    {'fingerprint': fp, 'rows': dataset.live_rows, 'bytes': dataset.nbytes, 'sessions': self.refcounts[fp],
+                     'pinned': fp in self.pinned}
+                    for fp, dataset in self.datasets.items()
+                ]
+            }
+
+def release_dataset_caches(fingerprint):
+    """Drop cached results and worker shards of a dataset no longer held"""
+    result_cache.invalidate(fingerprint)
+    parallel_matcher.drop(fingerprint)
+
+# Store uploaded data in memory (the SQLite backend uses it as a per-process cache)
+dataset_store = DatasetStore(
+    app.config['DATASET_SESSION_TTL'],
+    app.config['DATASET_MEMORY_BUDGET'],
+    on_release=release_dataset_caches
+)
+
+class MemoryBackend:
+    """Default storage backend: datasets, context and unmatched errors live in this process"""
+
+    name = 'memory'
+
+    def __init__(self, store):
+        self.store = store
+
+    def save_dataset(self, session_id, dataset):
+        """Attach a session to a dataset, returning the shared copy"""
+        shared = self.store.lookup(dataset.fingerprint)
+        return self.store.attach(session_id, shared or dataset)
+
+    def load_dataset(self, session_id):
+        return self.store.get(session_id)
+
+    def save_dataset_edit(self, session_id, previous, dataset, changed_rows):
+        """Point the session at the edited version of its dataset"""
+        return self.save_dataset(session_id, dataset)
+
+    def dataset_fingerprint(self, session_id):
+        """Fingerprint of the session's dataset without loading it"""
+        dataset = self.store.get(session_id)
+        return dataset.fingerprint if dataset is not None else None
+
+    def release_dataset(self, session_id):
+        self.store.detach(session_id)
+
+    def get_context(self, session_id):
+        entry = conversation_context.get(session_id)
+        if entry is None or time.time() - entry[0] > app.config['FOLLOW_UP_TTL']:
+            return None
+        return entry[1]
+
+    def set_context(self, session_id, context):
+        conversation_context.pop(session_id, None)
+        if context is not None:
+            conversation_context[session_id] = (time.time(), context)
+            while len(conversation_context) > app.config['FOLLOW_UP_MAX_CONTEXTS']:
+                conversation_context.popitem(last=False)
+
+    def record_unmatched_batch(self, error_entries):
+        unmatched_errors.add_batch(error_entries)
+
+    def top_unmatched(self, limit=None):
+        return unmatched_errors.top(limit)
+
+    def recent_unmatched(self, limit=None):
+        return unmatched_errors.recent_entries(limit)
+
+    def unmatched_stats(self):
+        return unmatched_errors.stats()
+
+    def stats(self):
+        stats = self.store.stats()
+        stats['backend'] = self.name
+        return stats
+
+class FTSMatchIndex(MatchIndex):
+    """Trigram candidate lookup answered by a shared SQLite FTS5 table"""
+
+    def __init__(self, backend, table):
+        super().__init__()
+        self.backend = backend
+        self.table = table
+
+    def add_postings(self, row_idx, grams):
+        # Only lengths and trigram counts are kept in memory; postings live in SQLite
+        pass
+
+    def gram_frequencies(self, query_grams):
+        return self.backend.fts_frequencies(self.table, query_grams)
+
+    def shared_counts(self, query_grams, deadline=None, min_shared=1):
+        # SQLite counts the shared trigrams of every version of the rows of this upload
+        # and its edits; counting the best version errs high, as stale postings do
+        shared = Counter()
+        rows = len(self)
+        found, complete = self.backend.fts_shared_counts(self.table, query_grams, min_shared, deadline)
+        for row_idx, count in found:
+            if row_idx < rows:
+                shared[row_idx] = max(shared[row_idx], count)
+        return shared, complete
+
+class SQLiteBackend:
+    """Storage backend shared by all worker processes through one SQLite file"""
+
+    name = 'sqlite'
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS datasets (
+            fingerprint TEXT PRIMARY KEY, columns TEXT NOT NULL, row_count INTEGER NOT NULL, created REAL NOT NULL,
+            parent TEXT, base TEXT NOT NULL, rows_key TEXT NOT NULL);
+        CREATE INDEX IF NOT EXISTS datasets_parent ON datasets (parent);
+        -- Rows a dataset version wrote, keyed by its rows_key
+        CREATE TABLE IF NOT EXISTS dataset_rows (
+            fingerprint TEXT NOT NULL, row_idx INTEGER NOT NULL, cells TEXT NOT NULL,
+            PRIMARY KEY (fingerprint, row_idx)) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, last_seen REAL NOT NULL);
+        CREATE INDEX IF NOT EXISTS sessions_fingerprint ON sessions (fingerprint);
+        CREATE TABLE IF NOT EXISTS contexts (
+            session_id TEXT PRIMARY KEY, context TEXT NOT NULL, updated REAL NOT NULL);
+        CREATE TABLE IF NOT EXISTS unmatched (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, error_message TEXT, session_id TEXT, user_context TEXT);
+        CREATE TABLE IF NOT EXISTS unmatched_groups (
+            key TEXT PRIMARY KEY, error_message TEXT NOT NULL, count INTEGER NOT NULL,
+            first_seen TEXT NOT NULL, last_seen TEXT NOT NULL);
+        CREATE INDEX IF NOT EXISTS unmatched_groups_count ON unmatched_groups (count);
+        CREATE TABLE IF NOT EXISTS unmatched_sessions (
+            key TEXT NOT NULL, session_id TEXT NOT NULL, PRIMARY KEY (key, session_id)) WITHOUT ROWID;
+    """
+
+    def __init__(self, path, store, session_ttl):
+        self.path = path
+        self.store = store  # Per-process cache of hydrated datasets
+        self.session_ttl = session_ttl
+        self.local = threading.local()
+        with self.connection() as conn:
+            conn.executescript(self.SCHEMA)
+        self.fts_enabled = self.check_fts()
+
+    def connection(self):
+        """Return this thread's connection to the shared database"""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self.local.conn = conn
+        return conn
+
+    def check_fts(self):
+        """Check that this SQLite build offers FTS5 with the trigram tokenizer"""
+        try:
+            with self.connection() as conn:
+                conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS temp.fts_probe USING fts5(error, tokenize='trigram')")
+                conn.execute('DROP TABLE temp.fts_probe')
+            return True
+        except sqlite3.OperationalError:
+            logger.warning('SQLite FTS5 trigram tokenizer unavailable; using in-memory match indexes')
+            return False
+
+    @staticmethod
+    def fts_table(fingerprint):
+        return f'fts_{fingerprint[:32]}'
+
+    def fts_frequencies(self, table, query_grams):
+        """Return the number of row versions holding each query trigram, from the table's fts5vocab view"""
+        query_grams = list(query_grams)
+        return dict(self.connection().execute(
+            f'SELECT term, doc FROM "{table}_vocab" WHERE term IN ({", ".join("?" * len(query_grams))})', query_grams
+        ).fetchall())
+
+    def fts_shared_counts(self, table, query_grams, min_shared=1, deadline=None):
+        """Return (row_idx, shared trigrams) for row versions sharing at least `min_shared` query
+        trigrams, counted by SQLite, and 1.0; or no rows and 0.0 if `deadline` passes first"""
+        phrases = json.dumps(['"' + gram.replace('"', '""') + '"' for gram in query_grams])
+        conn = self.connection()
+        if deadline is not None:
+            conn.set_progress_handler(lambda: time.perf_counter() >= deadline, 10000)
+        try:
+            # Only versions that reach `min_shared` are looked up for their row index
+            found = conn.execute(
+                f"""SELECT "{table}".row_idx, counts.shared FROM (
+                        SELECT "{table}".rowid AS version, COUNT(*) AS shared
+                        FROM json_each(?) AS phrases JOIN "{table}" ON "{table}" MATCH phrases.value
+                        GROUP BY "{table}".rowid HAVING shared >= ?) AS counts
+                    JOIN "{table}" ON "{table}".rowid = counts.version""",
+                (phrases, min_shared)
+            ).fetchall()
+        except sqlite3.OperationalError:
+            if deadline is None or time.perf_counter() < deadline:
+                raise
+            return [], 0.0
+        finally:
+            if deadline is not None:
+                conn.set_progress_handler(None, 0)
+        return found, 1.0
+
+    def insert_dataset(self, conn, dataset, row_ids, parent=None, base=None):
+        """Store a dataset version: all rows of an upload, or only the rows an edit changed"""
+        base = base or dataset.fingerprint
+        # A version's rows are stored under its rows_key, which outlives the version when a later one is folded in
+        rows_key = uuid.uuid4().hex
+        conn.execute(
+            'INSERT INTO datasets (fingerprint, columns, row_count, created, parent, base, rows_key) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (dataset.fingerprint, json.dumps(dataset.columns, default=str), len(dataset), time.time(), parent, base, rows_key)
+        )
+        # Deleted rows are stored as null so they hide the parent's version of the row
+        conn.executemany(
+            'INSERT INTO dataset_rows (fingerprint, row_idx, cells) VALUES (?, ?, ?)',
+            ((rows_key, row_idx, 'null' if row_idx in dataset.deleted else self.encode_row(dataset, row_idx))
+             for row_idx in row_ids)
+        )
+        if self.fts_enabled:
+            # One FTS table per upload holds every version of its rows; outdated
+            # versions only add candidates, which are scored against the current text.
+            # Its fts5vocab view counts the rows holding each trigram
+            table = self.fts_table(base)
+            conn.execute(f'CREATE VIRTUAL TABLE IF NOT EXISTS "{table}" USING fts5(error, row_idx UNINDEXED, tokenize=\'trigram\')')
+            conn.execute(f'CREATE VIRTUAL TABLE IF NOT EXISTS "{table}_vocab" USING fts5vocab("{table}", \'row\')')
+            conn.executemany(f'INSERT INTO "{table}" (error, row_idx) VALUES (?, ?)',
+                             ((dataset.errors_lower[row_idx], row_idx) for row_idx in row_ids if row_idx not in dataset.deleted))
+
+    def save_dataset(self, session_id, dataset):
+        """Persist a dataset once per content and point the session at it"""
+        conn = self.connection()
+        with conn:
+            exists = conn.execute('SELECT 1 FROM datasets WHERE fingerprint = ?', (dataset.fingerprint,)).fetchone()
+            if not exists:
+                self.insert_dataset(conn, dataset, range(len(dataset)))
+            previous = conn.execute('SELECT fingerprint FROM sessions WHERE session_id = ?', (session_id,)).fetchone()
+            conn.execute(
+                'INSERT OR REPLACE INTO sessions (session_id, fingerprint, last_seen) VALUES (?, ?, ?)',
+                (session_id, dataset.fingerprint, time.time())
+            )
+            if previous and previous[0] != dataset.fingerprint:
+                self.drop_if_unused(conn, previous[0])
+        shared = self.store.lookup(dataset.fingerprint)
+        return self.store.attach(session_id, shared or dataset)
+
+    def save_dataset_edit(self, session_id, previous, dataset, changed_rows):
+        """Store an edited dataset as its changed rows on top of the previous version"""
+        conn = self.connection()
+        with conn:
+            exists = conn.execute('SELECT 1 FROM datasets WHERE fingerprint = ?', (dataset.fingerprint,)).fetchone()
+            if not exists:
+                parent = conn.execute('SELECT base FROM datasets WHERE fingerprint = ?', (previous,)).fetchone()
+                if parent is None:
+                    self.insert_dataset(conn, dataset, range(len(dataset)))
+                else:
+                    self.insert_dataset(conn, dataset, sorted(changed_rows), previous, parent[0])
+            base = conn.execute('SELECT base FROM datasets WHERE fingerprint = ?', (dataset.fingerprint,)).fetchone()[0]
+            conn.execute(
+                'INSERT OR REPLACE INTO sessions (session_id, fingerprint, last_seen) VALUES (?, ?, ?)',
+                (session_id, dataset.fingerprint, time.time())
+            )
+            self.drop_if_unused(conn, previous)
+        if isinstance(dataset.index, FTSMatchIndex):
+            dataset.index.table = self.fts_table(base)
+        shared = self.store.lookup(dataset.fingerprint)
+        return self.store.attach(session_id, shared or dataset)
+
+    @staticmethod
+    def encode_row(dataset, row_idx):
+        values = [column[row_idx] for column in dataset.cells]
+        missing = [col_idx for col_idx, value in enumerate(values) if value is MISSING]
+        return json.dumps([[None if value is MISSING else value for value in values], missing], default=str)
+
+    def load_dataset(self, session_id):
+        """Return the session's dataset, hydrating it from SQLite if this process lacks it"""
+        conn = self.connection()
+        now = time.time()
+        with conn:
+            row = conn.execute('SELECT fingerprint, last_seen FROM sessions WHERE session_id = ?', (session_id,)).fetchone()
+            if row is None:
+                self.store.detach(session_id)
+                return None
+            fingerprint, last_seen = row
+            if now - last_seen > self.session_ttl:
+                self.release_dataset(session_id)
+                return None
+            conn.execute('UPDATE sessions SET last_seen = ? WHERE session_id = ?', (now, session_id))
+        
+        dataset = self.store.get(session_id)
+        if dataset is not None and dataset.fingerprint == fingerprint:
+            return dataset
+        dataset = self.store.lookup(fingerprint) or self.hydrate(fingerprint)
+        return self.store.attach(session_id, dataset) if dataset is not None else None
+
+    def dataset_fingerprint(self, session_id):
+        row = self.connection().execute('SELECT fingerprint FROM sessions WHERE session_id = ?', (session_id,)).fetchone()
+        return row[0] if row else None
+
+    def hydrate(self, fingerprint):
+        """Rebuild a compiled dataset from its stored rows"""
+        conn = self.connection()
+        meta = conn.execute('SELECT columns, row_count, base FROM datasets WHERE fingerprint = ?', (fingerprint,)).fetchone()
+        if meta is None:
+            return None
+        columns, row_count, base = json.loads(meta[0]), meta[1], meta[2]
+        index = FTSMatchIndex(self, self.fts_table(base)) if self.fts_enabled else None
+        dataset = CompiledDataset(columns=columns, index=index)
+        # Each row comes from the latest version along the chain of edits back to the upload
+        cursor = conn.execute(
+            """WITH RECURSIVE chain (parent, rows_key, depth) AS (
+                   SELECT parent, rows_key, 0 FROM datasets WHERE fingerprint = ?
+                   UNION ALL
+                   SELECT datasets.parent, datasets.rows_key, chain.depth + 1 FROM datasets JOIN chain ON datasets.fingerprint = chain.parent)
+               SELECT dataset_rows.row_idx, dataset_rows.cells FROM dataset_rows JOIN chain ON dataset_rows.fingerprint = chain.rows_key
+               ORDER BY dataset_rows.row_idx, chain.depth""",
+            (fingerprint,)
+        )
+        deleted = []
+        
+        def rows():
+            # Deleted rows, stored as null, keep their ids taken
+            next_idx = 0
+            for row_idx, cells in cursor:
+                if row_idx < next_idx:
+                    continue  # An older version of a row already read
+                while next_idx < row_idx:
+                    deleted.append(next_idx)
+                    next_idx += 1
+                    yield {}
+                next_idx += 1
+                if cells == 'null':
+                    deleted.append(row_idx)
+                    yield {}
+                else:
+                    yield self.decode_row(columns, cells)
+            deleted.extend(range(next_idx, row_count))
+            yield from ({} for _ in range(next_idx, row_count))
+        
+        for chunk in iter_chunks(rows(), app.config['INGEST_CHUNK_ROWS']):
+            dataset.extend(chunk)
+        for row_idx in deleted:
+            dataset.delete_row(row_idx)
+        # Keep the fingerprint of the original upload even if cell types changed in JSON
+        dataset.fingerprint = fingerprint
+        return dataset
+
+    @staticmethod
+    def decode_row(columns, cells):
+        values, missing = json.loads(cells)
+        missing = set(missing)
+        return {col_name: value for col_idx, (col_name, value) in enumerate(zip(columns, values)) if col_idx not in missing}
+
+    def release_dataset(self, session_id):
+        conn = self.connection()
+        with conn:
+            row = conn.execute('SELECT fingerprint FROM sessions WHERE session_id = ?', (session_id,)).fetchone()
+            conn.execute('DELETE FROM sessions WHERE session_id = ?', (session_id,))
+            if row:
+                self.drop_if_unused(conn, row[0])
+        self.store.detach(session_id)
+
+    def drop_if_unused(self, conn, fingerprint):
+        """Delete a stored dataset version once no session refers to it, folding a single later version into it"""
+        while fingerprint is not None:
+            if conn.execute('SELECT 1 FROM sessions WHERE fingerprint = ? LIMIT 1', (fingerprint,)).fetchone():
+                return
+            meta = conn.execute('SELECT parent, base, rows_key FROM datasets WHERE fingerprint = ?', (fingerprint,)).fetchone()
+            if meta is None:
+                return
+            parent, base, rows_key = meta
+            children = conn.execute('SELECT fingerprint, rows_key FROM datasets WHERE parent = ? LIMIT 2',
+                                    (fingerprint,)).fetchall()
+            if children and (parent is None or len(children) > 1):
+                return  # Later versions still read these rows
+            conn.execute('DELETE FROM datasets WHERE fingerprint = ?', (fingerprint,))
+            if children:
+                # The later version's rows join this version's, so folding costs only the rows of one edit
+                child, child_rows_key = children[0]
+                conn.execute(
+                    """INSERT OR REPLACE INTO dataset_rows (fingerprint, row_idx, cells)
+                       SELECT ?, row_idx, cells FROM dataset_rows WHERE fingerprint = ?""",
+                    (rows_key, child_rows_key)
+                )
+                conn.execute('DELETE FROM dataset_rows WHERE fingerprint = ?', (child_rows_key,))
+                conn.execute('UPDATE datasets SET parent = ?, rows_key = ? WHERE fingerprint = ?', (parent, rows_key, child))
+                return
+            conn.execute('DELETE FROM dataset_rows WHERE fingerprint = ?', (rows_key,))
+            if parent is None:
+                # The upload goes last, once no version needs its rows
+                conn.execute(f'DROP TABLE IF EXISTS "{self.fts_table(base)}_vocab"')
+                conn.execute(f'DROP TABLE IF EXISTS "{self.fts_table(base)}"')
+            fingerprint = parent
+
+    def get_context(self, session_id):
+        row = self.connection().execute(
+            'SELECT context FROM contexts WHERE session_id = ? AND updated >= ?',
+            (session_id, time.time() - app.config['FOLLOW_UP_TTL'])
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set_context(self, session_id, context):
+        conn = self.connection()
+        now = time.time()
+        with conn:
+            if context is None:
+                conn.execute('DELETE FROM contexts WHERE session_id = ?', (session_id,))
+            else:
+                conn.execute(
+                    'INSERT OR REPLACE INTO contexts (session_id, context, updated) VALUES (?, ?, ?)',
+                    (session_id, json.dumps(context, default=str), now)
+                )
+                conn.execute('DELETE FROM contexts WHERE updated < ?', (now - app.config['FOLLOW_UP_TTL'],))
+
+    def record_unmatched_batch(self, error_entries):
+        """Append recent entries and fold the batch into the per-message groups"""
+        groups = {}
+        for error_entry in error_entries:
+            key = normalize_unmatched(error_entry['error_message'])
+            group = groups.setdefault(key, [error_entry['error_message'], 0, error_entry['timestamp'], error_entry['timestamp'], set()])
+            group[1] += 1
+            group[2] = min(group[2], error_entry['timestamp'])
+            group[3] = max(group[3], error_entry['timestamp'])
+            group[4].add(error_entry['session_id'])
+        
+        conn = self.connection()
+        with conn:
+            conn.executemany(
+                'INSERT INTO unmatched (timestamp, error_message, session_id, user_context) VALUES (?, ?, ?, ?)',
+                ((error_entry['timestamp'], error_entry['error_message'], error_entry['session_id'],
+                  json.dumps(error_entry['user_context'], default=str)) for error_entry in error_entries)
+            )
+            # The verbatim table is only a ring buffer of the most recent entries
+            conn.execute('DELETE FROM unmatched WHERE id <= (SELECT MAX(id) FROM unmatched) - ?',
+                         (app.config['UNMATCHED_RECENT_SIZE'],))
+            conn.executemany(
+                """INSERT INTO unmatched_groups (key, error_message, count, first_seen, last_seen) VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT (key) DO UPDATE SET count = count + excluded.count,
+                       first_seen = min(first_seen, excluded.first_seen), last_seen = max(last_seen, excluded.last_seen)""",
+                ((key, message, count, first_seen, last_seen) for key, (message, count, first_seen, last_seen, _) in groups.items())
+            )
+            conn.executemany(
+                'INSERT OR IGNORE INTO unmatched_sessions (key, session_id) VALUES (?, ?)',
+                ((key, str(session_id)) for key, group in groups.items() for session_id in group[4])
+            )
+
+    def top_unmatched(self, limit=None):
+        query = """SELECT g.error_message, g.count, g.first_seen, g.last_seen,
+                          (SELECT COUNT(*) FROM unmatched_sessions s WHERE s.key = g.key)
+                   FROM unmatched_groups g ORDER BY g.count DESC, g.last_seen DESC"""
+        rows = self.connection().execute(query + (' LIMIT ?' if limit else ''), (limit,) if limit else ()).fetchall()
+        return [
+            {'error_message': error_message, 'count': count, 'first_seen': first_seen, 'last_seen': last_seen,
+             'session_count': session_count}
+            for error_message, count, first_seen, last_seen, session_count in rows
+        ]
+
+    def recent_unmatched(self, limit=None):
+        query = 'SELECT timestamp, error_message, session_id, user_context FROM unmatched ORDER BY id DESC'
+        rows = self.connection().execute(query + (' LIMIT ?' if limit else ''), (limit,) if limit else ()).fetchall()
+        return [
+            {'timestamp': timestamp, 'error_message': error_message, 'session_id': session_id,
+             'user_context': json.loads(user_context) if user_context else None}
+            for timestamp, error_message, session_id, user_context in reversed(rows)
+        ]
+
+    def unmatched_stats(self):
+        total, distinct = self.connection().execute('SELECT COALESCE(SUM(count), 0), COUNT(*) FROM unmatched_groups').fetchone()
+        return {'total_count': total, 'distinct_count': distinct}
+
+    def stats(self):
+        conn = self.connection()
+        stats = self.store.stats()
+        stats['backend'] = self.name
+        stats['fts_enabled'] = self.fts_enabled
+        stats['stored_datasets'] = conn.execute('SELECT COUNT(*) FROM datasets').fetchone()[0]
+        stats['stored_sessions'] = conn.execute('SELECT COUNT(*) FROM sessions').fetchone()[0]
+        return stats
+
+def create_storage_backend():
+    """Build the storage backend selected by STORAGE_BACKEND"""
+    if app.config['STORAGE_BACKEND'] == 'sqlite':
+        return SQLiteBackend(app.config['SQLITE_PATH'], dataset_store, app.config['DATASET_SESSION_TTL'])
+    return MemoryBackend(dataset_store)
+
+storage = create_storage_backend()
+
+def extract_keywords(text):
+    """Extract meaningful keywords from error message"""
+    return keyword_matcher().extract(text)
+
+def match_category(match):
+    """Category of a match, precomputed at upload for matches built from a dataset"""
+    category = match.get('category')
+    if category is None:
+        category = determine_error_category(extract_keywords(match['error']))
+    return category
+
+@instrumented('is_ambiguous_query')
 def is_ambiguous_query(matches, original_message):
     """Determine if the query is ambiguous and needs clarification"""
     if len(matches) < 2:
@@ -87,9 +1481,7 @@ def is_ambiguous_query(matches, original_message):
         # Check if they represent different error categories
         error_categories = set()
         for match in score_groups[0]:
-            keywords = extract_keywords(match['error'])
-            category = determine_error_category(keywords)
-            error_categories.add(category)
+            error_categories.add(match_category(match))
         
         # If different categories, it's ambiguous
         if len(error_categories) > 1:
@@ -104,19 +1496,13 @@ def is_ambiguous_query(matches, original_message):
 
 def determine_error_category(keywords):
     """Categorize error based on keywords"""
-    if any(term in keywords for term in ['memory', 'ram']):
-        return 'memory'
-    elif any(term in keywords for term in ['disk', 'drive', 'ssd', 'hdd', 'mbr', 'gpt']):
-        return 'storage'
-    elif any(term in keywords for term in ['boot', 'bootloader', 'grub', 'ntldr', 'bootmgr']):
-        return 'bootloader'
-    elif any(term in keywords for term in ['bios', 'uefi', 'tpm', 'secure']):
-        return 'firmware'
-    elif any(term in keywords for term in ['cpu']):
-        return 'processor'
-    else:
-        return 'general'
+    return keyword_matcher().categorize(keywords)
 
+def error_categories():
+    """Categories errors can be filtered by, including the fallback 'general'"""
+    return [category for category, _ in keyword_matcher().category_rules] + ['general']
+
+@instrumented('generate_follow_up_question')
 def generate_follow_up_question(matches, original_message):
     """Generate intelligent follow-up questions based on matches"""
     if len(matches) < 2:
@@ -125,9 +1511,7 @@ def generate_follow_up_question(matches, original_message):
     # Analyze the matches to create targeted questions
     categories = defaultdict(list)
     for match in matches[:5]:  # Look at top 5 matches
-        keywords = extract_keywords(match['error'])
-        category = determine_error_category(keywords)
-        categories[category].append(match)
+        categories[match_category(match)].append(match)
     
     # Generate questions based on categories
     if len(categories) > 1:
@@ -188,6 +1572,72 @@ def generate_follow_up_question(matches, original_message):
     
     return None
 
+class UnmatchedErrorWriter:
+    """Background, batched sink for unmatched errors fed by a bounded queue"""
+
+    def __init__(self, max_queue, batch_size, flush_interval):
+        self.queue = queue.Queue(max_queue)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.thread = None
+        self.pid = None
+        self.lock = threading.Lock()
+
+    def submit(self, error_entry):
+        """Queue an entry without blocking; drop it if the writer is saturated"""
+        self.ensure_running()
+        try:
+            self.queue.put_nowait(error_entry)
+        except queue.Full:
+            self.dropped += 1
+
+    def ensure_running(self):
+        # Threads do not survive a fork, so each worker process starts its own
+        if self.pid == os.getpid():
+            return
+        with self.lock:
+            if self.pid != os.getpid():
+                self.thread = threading.Thread(target=self.run, name='unmatched-error-writer', daemon=True)
+                self.thread.start()
+                self.pid = os.getpid()
+
+    def run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get(timeout=self.flush_interval))
+                except queue.Empty:
+                    break
+            try:
+                self.write(batch)
+            except Exception:
+                logger.exception('Failed to record unmatched errors')
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def write(self, batch):
+        storage.record_unmatched_batch(batch)
+        
+        # Log to file
+        for error_entry in batch:
+            logger.info(f"UNMATCHED_ERROR: {json.dumps(error_entry, default=str)}")
+
+    def flush(self):
+        """Block until every queued entry has been written"""
+        if self.pid == os.getpid():
+            self.queue.join()
+
+unmatched_writer = UnmatchedErrorWriter(
+    app.config['UNMATCHED_QUEUE_SIZE'],
+    app.config['UNMATCHED_BATCH_SIZE'],
+    app.config['UNMATCHED_FLUSH_INTERVAL']
+)
+atexit.register(unmatched_writer.flush)
+
+@instrumented('log_unmatched_error')
 def log_unmatched_error(error_message, session_id, user_context=None):
     """Log unmatched error messages for dataset improvement"""
     timestamp = datetime.now().isoformat()
@@ -199,22 +1649,16 @@ def log_unmatched_error(error_message, session_id, user_context=None):
         'user_context': user_context
     }
     
-    # Add to in-memory list
-    unmatched_errors.append(error_entry)
-    
-    # Log to file
-    logger.info(f"UNMATCHED_ERROR: {json.dumps(error_entry)}")
-    
-    # Keep only last 100 unmatched errors in memory
-    if len(unmatched_errors) > 100:
-        unmatched_errors.pop(0)
+    # Hand off to the background writer so /chat never waits on disk I/O
+    unmatched_writer.submit(error_entry)
 
-def generate_improvement_suggestions(error_message):
+def generate_improvement_suggestions(error_message, keywords=None):
     """Generate suggestions for improving the dataset"""
     suggestions = []
     
     # Analyze the error message to provide contextual suggestions
-    keywords = extract_keywords(error_message)
+    if keywords is None:
+        keywords = extract_keywords(error_message)
     error_lower = error_message.lower()
     
     if not keywords:
@@ -243,15 +1687,17 @@ def generate_improvement_suggestions(error_message):
     
     return suggestions[:6]  # Return max 6 suggestions
 
-def generate_database_entry_template(error_message):
+def generate_database_entry_template(error_message, keywords=None):
     """Generate a template for adding new entries to the database"""
+    if keywords is None:
+        keywords = extract_keywords(error_message)
     template = {
         'error_message': error_message,
         'primary_fix': '[Please provide the main solution for this error]',
         'alternative_fix': '[Optional: Provide an alternative solution]',
         'additional_fix': '[Optional: Provide additional troubleshooting steps]',
         'priority': '[High/Medium/Low - Set priority level]',
-        'category': determine_error_category(extract_keywords(error_message)),
+        'category': determine_error_category(keywords),
         'suggested_format': {
             'csv_row': f'"{error_message}","[Primary Fix]","[Alternative Fix]","[Additional Fix]","Medium"',
             'excel_columns': ['Error Message', 'Primary Fix', 'Alternative Fix', 'Additional Fix', 'Priority']
@@ -259,106 +1705,1154 @@ def generate_database_entry_template(error_message):
     }
     return template
 
+def iter_text_lines(stream, encoding='utf-8', chunk_size=64 * 1024, errors='strict'):
+    """Decode a binary stream incrementally and yield its lines with their endings"""
+    decoder = codecs.getincrementaldecoder(encoding)(errors)
+    pending = ''
+    while True:
+        chunk = stream.read(chunk_size)
+        pending += decoder.decode(chunk, final=not chunk)
+        *lines, pending = pending.split('\n')
+        for line in lines:
+            yield line + '\n'
+        if not chunk:
+            break
+    if pending:
+        yield pending
+
+def iter_chunks(rows, chunk_rows):
+    """Group an iterable of rows into lists of at most chunk_rows rows"""
+    while True:
+        chunk = list(islice(rows, chunk_rows))
+        if not chunk:
+            return
+        yield chunk
+
+def iter_excel_rows(sheet_rows, columns):
+    """Turn worksheet value tuples into row dictionaries keyed by header"""
+    for row in sheet_rows:
+        if any(cell is not None for cell in row):  # Skip empty rows
+            row_dict = {}
+            for i, value in enumerate(row):
+                if i < len(columns) and columns[i]:
+                    row_dict[columns[i]] = value if value is not None else ''
+            yield row_dict
+
+def peak_rss_bytes():
+    """Peak resident set size of this process, or None where unsupported"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+@instrumented('read_file_data')
 def read_file_data(file):
-    """Read CSV or Excel file and return data as list of dictionaries"""
+    """Stream a CSV or Excel file into a compiled dataset, chunk by chunk"""
     try:
-        if file.filename.lower().endswith('.csv'):
-            # Read CSV file
-            content = file.read().decode('utf-8')
-            csv_reader = csv.DictReader(io.StringIO(content))
-            data = list(csv_reader)
-            columns = csv_reader.fieldnames
-        else:
-            # Read Excel file
-            from openpyxl import load_workbook
-            workbook = load_workbook(file)
-            sheet = workbook.active
-            
-            # Get headers from first row
-            columns = [cell.value for cell in sheet[1]]
-            
-            # Get data rows
-            data = []
-            for row in sheet.iter_rows(min_row=2, values_only=True):
-                if any(cell is not None for cell in row):  # Skip empty rows
-                    row_dict = {}
-                    for i, value in enumerate(row):
-                        if i < len(columns) and columns[i]:
-                            row_dict[columns[i]] = value if value is not None else ''
-                    data.append(row_dict)
+        started = time.perf_counter()
+        chunk_rows = app.config['INGEST_CHUNK_ROWS']
+        track_memory = app.config['INGEST_TRACK_MEMORY'] and not tracemalloc.is_tracing()
+        if track_memory:
+            tracemalloc.start()
+        try:
+            if file.filename.lower().endswith('.csv'):
+                # Read CSV file without holding the whole upload in memory
+                csv_reader = csv.DictReader(iter_text_lines(file.stream))
+                columns = csv_reader.fieldnames
+                data = CompiledDataset(columns=dict.fromkeys(columns or []))
+                for chunk in iter_chunks(csv_reader, chunk_rows):
+                    data.extend(chunk)
+            else:
+                # Read Excel file lazily, one row at a time
+                from openpyxl import load_workbook
+                workbook = load_workbook(file, read_only=True)
+                try:
+                    sheet_rows = workbook.active.iter_rows(values_only=True)
+                    
+                    # Get headers from first row
+                    columns = list(next(sheet_rows, ()))
+                    
+                    # Get data rows
+                    data = CompiledDataset(columns=dict.fromkeys(col for col in columns if col))
+                    for chunk in iter_chunks(iter_excel_rows(sheet_rows, columns), chunk_rows):
+                        data.extend(chunk)
+                finally:
+                    workbook.close()
+            peak_memory = tracemalloc.get_traced_memory()[1] if track_memory else peak_rss_bytes()
+        finally:
+            if track_memory:
+                tracemalloc.stop()
+        
+        elapsed = time.perf_counter() - started
+        data.ingest_stats = {
+            'rows': len(data),
+            'seconds': round(elapsed, 4),
+            'rows_per_sec': round(len(data) / elapsed) if elapsed > 0 else None,
+            'peak_memory_bytes': peak_memory,
+            'peak_memory_source': 'tracemalloc' if track_memory else 'process_rss'
+        }
+        logger.info(f"INGEST: {file.filename} {json.dumps(data.ingest_stats)}")
         
         return data, columns
     except Exception as e:
         raise Exception(f"Error reading file: {str(e)}")
 
-def find_best_matches(error_message, data, threshold=0.6):
+CATALOG_ARTIFACT_MAGIC = b'CHATBOTDS'
+CATALOG_ARTIFACT_VERSION = 1
+
+# Preloaded catalogs by name; the dataset store keeps them pinned
+catalogs = {}
+
+def keyword_vocabulary_digest():
+    """Digest of the keyword configuration the stored keywords and categories were computed with"""
+    matcher = keyword_matcher()
+    rules = [[category, sorted(category_terms)] for category, category_terms in matcher.category_rules]
+    return hashlib.sha256(json.dumps([matcher.terms, rules]).encode('utf-8')).hexdigest()
+
+def restore_value(value):
+    # Fix sets and keyword tuples come back from JSON as lists
+    return tuple(restore_value(item) for item in value) if isinstance(value, list) else value
+
+def write_catalog_artifact(path, dataset, source):
+    """Save a compiled catalog as a JSON header followed by its raw, 8-byte aligned arrays"""
+    index = dataset.index
+    grams = list(index.postings)
+    postings_offsets = array('Q', [0])
+    postings_rows = array('I')
+    for gram in grams:
+        postings_rows.extend(index.postings[gram])
+        postings_offsets.append(len(postings_rows))
+    
+    arrays = [(f'cell:{col_idx}', column.ids) for col_idx, column in enumerate(dataset.cells)]
+    arrays += [(name, getattr(dataset, name).ids) for name in ('errors_lower', 'fix_sets', 'priorities', 'keywords', 'categories')]
+    arrays += [('priority_ranks', dataset.priority_ranks), ('index_lengths', index.lengths),
+               ('index_gram_counts', index.gram_counts), ('postings_offsets', postings_offsets), ('postings_rows', postings_rows)]
+    sections = {}
+    offset = 0
+    for name, values in arrays:
+        sections[name] = [offset, len(values), values.typecode]
+        offset += -(-len(values) * values.itemsize // 8) * 8
+    
+    header = json.dumps({
+        'version': CATALOG_ARTIFACT_VERSION,
+        'byteorder': sys.byteorder,
+        'source': source,
+        'vocabulary': keyword_vocabulary_digest(),
+        'fingerprint': dataset.fingerprint,
+        'columns': dataset.columns,
+        'values': dataset.table.values[1:],
+        'table_nbytes': dataset.table.nbytes,
+        'grams': grams,
+        'short_rows': index.short_rows,
+        'index_nbytes': index.nbytes,
+        'sections': sections
+    }, default=str).encode('utf-8')
+    prefix = CATALOG_ARTIFACT_MAGIC + struct.pack('<II', CATALOG_ARTIFACT_VERSION, len(header)) + header
+    
+    # Write to a temporary file first so concurrent workers never map a partial artifact
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), delete=False) as artifact:
+        artifact.write(prefix + b'\0' * (-len(prefix) % 8))
+        for _, values in arrays:
+            artifact.write(values.tobytes())
+            artifact.write(b'\0' * (-len(values) * values.itemsize % 8))
+    os.replace(artifact.name, path)
+
+def load_catalog_artifact(path, source):
+    """Map a compiled catalog into memory, or return None if it is missing, stale or unreadable"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as artifact:
+            mapping = mmap.mmap(artifact.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:  # An empty file cannot be mapped
+        logger.warning(f"Cannot map catalog artifact {path}, recompiling: {e}")
+        return None
+    try:
+        dataset = map_catalog_artifact(mapping, source)
+    except (ValueError, KeyError, IndexError, TypeError, struct.error) as e:
+        # A truncated or corrupt artifact is rebuilt from its source like a stale one
+        logger.warning(f"Catalog artifact {path} is unreadable, recompiling: {e}")
+        dataset = None
+    if dataset is None:
+        mapping.close()
+    return dataset
+
+def map_catalog_artifact(mapping, source):
+    """Build a dataset over the arrays of a mapped artifact, or return None if it is stale"""
+    start = len(CATALOG_ARTIFACT_MAGIC)
+    if mapping[:start] != CATALOG_ARTIFACT_MAGIC:
+        return None
+    version, header_length = struct.unpack_from('<II', mapping, start)
+    if version != CATALOG_ARTIFACT_VERSION:
+        return None
+    header_start = start + 8
+    header = json.loads(mapping[header_start:header_start + header_length])
+    if (header['byteorder'] != sys.byteorder or header['source'] != source
+            or header['vocabulary'] != keyword_vocabulary_digest()):
+        return None
+    data_start = header_start + header_length
+    data_start += -data_start % 8
+    view = memoryview(mapping)
+    
+    def section(name):
+        offset, length, typecode = header['sections'][name]
+        offset += data_start
+        end = offset + length * array(typecode).itemsize
+        if end > len(mapping):
+            raise ValueError(f'section {name} ends past the end of the file')
+        return view[offset:end].cast(typecode)
+    
+    # The arrays stay in the shared page cache; only values and dicts become Python objects
+    dataset = CompiledDataset(columns=header['columns'])
+    table = dataset.table
+    table.values = [MISSING] + [restore_value(value) for value in header['values']]
+    for value_id, value in enumerate(table.values[1:], 1):
+        table.ids.setdefault(value if type(value) is str else (type(value), value), value_id)
+    table.nbytes = header['table_nbytes']
+    for col_idx, column in enumerate(dataset.cells):
+        column.ids = section(f'cell:{col_idx}')
+    for name in ('errors_lower', 'fix_sets', 'priorities', 'keywords', 'categories'):
+        getattr(dataset, name).ids = section(name)
+    dataset.priority_ranks = section('priority_ranks')
+    
+    index = dataset.index
+    index.lengths = section('index_lengths')
+    index.gram_counts = section('index_gram_counts')
+    postings_offsets = section('postings_offsets')
+    postings_rows = section('postings_rows')
+    index.postings = {gram: postings_rows[postings_offsets[gram_idx]:postings_offsets[gram_idx + 1]]
+                      for gram_idx, gram in enumerate(header['grams'])}
+    index.short_rows = header['short_rows']
+    index.nbytes = header['index_nbytes']
+    
+    dataset.fingerprint = header['fingerprint']
+    # Edits chain from the stored fingerprint, as they would from the upload's hash
+    dataset.content_hash = hashlib.sha256(dataset.fingerprint.encode('utf-8'))
+    dataset.artifact = mapping
+    return dataset
+
+def load_catalog(path, artifact_dir):
+    """Load one catalog from its compiled artifact, compiling the source file if needed"""
+    started = time.perf_counter()
+    stat = os.stat(path)
+    source = {'file': os.path.basename(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    name = os.path.splitext(os.path.basename(path))[0]
+    artifact_path = os.path.join(artifact_dir, f'{name}.v{CATALOG_ARTIFACT_VERSION}.catalog')
+    
+    dataset = load_catalog_artifact(artifact_path, source)
+    loaded_from = 'artifact'
+    if dataset is None:
+        with open(path, 'rb') as stream:
+            dataset, columns = read_file_data(FileStorage(stream, filename=os.path.basename(path)))
+        if len(columns) < 2:
+            raise ValueError('File must have at least 2 columns (Error Message and at least one Fix column)')
+        write_catalog_artifact(artifact_path, dataset, source)
+        # Serve from the mapping so every worker shares the same pages
+        dataset = load_catalog_artifact(artifact_path, source) or dataset
+        loaded_from = 'source'
+    
+    dataset.catalog = {'name': name, 'loaded_from': loaded_from, 'seconds': round(time.perf_counter() - started, 4)}
+    return name, dataset
+
+def preload_catalogs():
+    """Load every catalog in CATALOG_DIR so sessions can attach to it by name"""
+    directory = app.config['CATALOG_DIR']
+    if not directory:
+        return
+    artifact_dir = app.config['CATALOG_ARTIFACT_DIR'] or os.path.join(directory, '.compiled')
+    os.makedirs(artifact_dir, exist_ok=True)
+    for file_name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, file_name)
+        if not os.path.isfile(path) or not allowed_file(file_name):
+            continue
+        try:
+            name, dataset = load_catalog(path, artifact_dir)
+        except Exception as e:
+            logger.error(f"CATALOG: could not load {path}: {e}")
+            continue
+        catalogs[name] = dataset_store.pin(dataset)
+        logger.info(f"CATALOG: {name} {json.dumps(dict(dataset.catalog, rows=dataset.live_rows))}")
+
+class MatchResults(list):
+    """Matches of one query, with the fraction of its candidate rows scored before the time budget ran out"""
+
+    def __init__(self, matches=(), coverage=1.0):
+        super().__init__(matches)
+        self.coverage = coverage
+
+    @property
+    def partial(self):
+        return self.coverage < 1.0
+
+def match_deadline(time_budget=None, messages=1):
+    """perf_counter deadline for a matching pass: the request's budget, capped by MATCH_TIME_BUDGET per message"""
+    cap = app.config['MATCH_TIME_BUDGET']
+    budgets = [budget for budget in (time_budget, cap and cap * messages) if budget]
+    return time.perf_counter() + min(budgets) if budgets else None
+
+def find_best_matches(error_message, data, threshold=None, limit=5, category=None, scorer=None, time_budget=None):
     """Find best matching error messages in the data"""
+    return find_best_matches_batch([error_message], data, threshold, limit, category, scorer, time_budget)[0]
+
+@instrumented('find_best_matches')
+def find_best_matches_batch(error_messages, data, threshold=None, limit=5, category=None, scorer=None, time_budget=None):
+    """Find the top `limit` matches for several error messages in one pass over the data"""
     if not data or len(data) == 0:
-        return []
+        return [MatchResults() for _ in error_messages]
+    
+    if not isinstance(data, CompiledDataset):
+        data = CompiledDataset(data)
+    
+    deadline = match_deadline(time_budget, len(error_messages))
+    scorer = get_scorer(scorer)
+    if threshold is None:
+        threshold = scorer.default_threshold
+    queries = [error_message.lower() for error_message in error_messages]
+    heaps, rows_scanned, candidates_scored, coverage = scorer.top_match_keys(data, queries, threshold, limit, category, deadline)
+    
+    coverage = [visited / candidates if visited < candidates else 1.0 for visited, candidates in coverage]
+    metrics.inc('chatbot_queries_total', len(queries), 'Error messages matched against a dataset')
+    metrics.inc('chatbot_partial_queries_total', sum(fraction < 1.0 for fraction in coverage),
+                'Error messages answered with best-so-far matches when the time budget ran out')
+    metrics.inc('chatbot_dataset_rows_total', len(data) * len(queries), 'Dataset rows an exhaustive scan would have visited')
+    metrics.inc('chatbot_rows_scanned_total', rows_scanned, 'Candidate rows visited after index lookup')
+    metrics.inc('chatbot_candidates_scored_total', candidates_scored, 'Rows given a full similarity score')
+    
+    # Sort by priority first, then similarity score (earlier rows win ties)
+    return [
+        MatchResults((data.match(-neg_row_idx, similarity_score) for _, similarity_score, neg_row_idx in sorted(heap, reverse=True)),
+                     fraction)
+        for heap, fraction in zip(heaps, coverage)
+    ]
+
+def match_order(data, queries, row_queries, deadline=None):
+    """Order candidate rows so likely matches are scored first: substring hits, then rows in
+    the query's keyword category, then the rest; higher priorities first within each.
+    Rows not reached by `deadline` follow in row order."""
+    matcher = keyword_matcher()
+    query_categories = [data.table.ids.get(matcher.categorize(tuple(matcher.extract(query)))) for query in queries]
+    # Work on value ids directly; this runs once per candidate row, ahead of any scoring
+    values = data.table.values
+    error_ids = data.errors_lower.ids
+    category_ids = data.categories.ids
+    priority_ranks = data.priority_ranks
+    
+    tiers = defaultdict(list)
+    unordered = []
+    for position, (row_idx, query_idxs) in enumerate(row_queries.items()):
+        if position and not position % INDEX_CHUNK_ROWS and time.perf_counter() >= deadline:
+            unordered = list(islice(row_queries, position, None))
+            break
+        stored_error = values[error_ids[row_idx]]
+        tier = 2
+        for query_idx in query_idxs:
+            query = queries[query_idx]
+            if query in stored_error or stored_error in query:
+                tier = 0
+                break
+            if category_ids[row_idx] == query_categories[query_idx]:
+                tier = 1
+        tiers[tier, -priority_ranks[row_idx]].append(row_idx)
+    return [row_idx for key in sorted(tiers) for row_idx in tiers[key]] + unordered
+
+def top_match_keys(data, queries, threshold, limit, category=None, deadline=None, exhaustive=False):
+    """Return per query the (priority rank, similarity, -row) keys of its top `limit` rows, the
+    number of rows visited and fully scored, and per query [candidate rows visited, candidate rows].
+    Rows still unvisited when `deadline` (a perf_counter time) passes are skipped; `exhaustive`
+    visits every row instead of the trigram shortlist."""
+    errors_lower = data.errors_lower
+    
+    # Only score the shortlist of rows sharing trigrams with each query,
+    # grouped by row so the per-row matcher setup is shared by all queries
+    row_queries = {}  # row -> tuple of query indexes; rows hit by one query share its tuple
+    complete = [1.0 for _ in queries]  # Share of each query's index lookup done before the deadline
+    for query_idx, error_message_lower in enumerate(queries):
+        if deadline is not None and query_idx and time.perf_counter() >= deadline:
+            complete[query_idx:] = [0.0] * (len(queries) - query_idx)
+            break
+        candidates = data.index.candidates(error_message_lower, threshold, deadline, exhaustive)
+        complete[query_idx] = candidates.complete
+        single = (query_idx,)
+        for start in range(0, len(candidates), INDEX_CHUNK_ROWS):
+            if deadline is not None and start and time.perf_counter() >= deadline:
+                complete[query_idx] *= start / len(candidates)
+                break
+            for row_idx in candidates[start:start + INDEX_CHUNK_ROWS]:
+                hit = row_queries.get(row_idx)
+                row_queries[row_idx] = single if hit is None else hit + single
     
-    # Get column names (first column is error messages)
-    columns = list(data[0].keys())
-    error_col = columns[0]
+    # Optionally keep only rows of one error category, compared by value id
+    if category is not None:
+        category_id = data.table.ids.get(category)
+        category_ids = data.categories.ids
+        row_queries = {row_idx: query_idxs for row_idx, query_idxs in row_queries.items()
+                       if category_ids[row_idx] == category_id}
     
-    matches = []
-    error_message_lower = error_message.lower()
+    # Per query, a min-heap of the best (priority rank, similarity, -row) keys so far;
+    # its root is the k-th best, which later rows must beat to get in
+    coverage = [[0, 0] for _ in queries]
+    for query_idxs in row_queries.values():
+        for query_idx in query_idxs:
+            coverage[query_idx][1] += 1
     
-    for row in data:
-        stored_error = str(row.get(error_col, '')).lower()
+    # Against a deadline, score the rows most likely to match first; the final
+    # result does not depend on the order, only how good a cut-off one is
+    order = match_order(data, queries, row_queries, deadline) if deadline is not None else sorted(row_queries)
+    skipped = ()
+    
+    heaps = [[] for _ in queries]
+    matcher = SequenceMatcher(None)
+    rows_scanned = 0
+    candidates_scored = 0
+    for position, row_idx in enumerate(order):
+        if deadline is not None and position and not position % 32 and time.perf_counter() >= deadline:
+            skipped = order[position:]
+            break
+        stored_error = errors_lower[row_idx]
+        priority_rank = data.priority_ranks[row_idx]
+        matcher.set_seq2(stored_error)
         
-        # Check for exact substring match first
-        if error_message_lower in stored_error or stored_error in error_message_lower:
-            similarity_score = 1.0
-        else:
-            # Calculate similarity score
-            similarity_score = similarity(error_message, str(row.get(error_col, '')))
+        for query_idx in row_queries[row_idx]:
+            error_message_lower = queries[query_idx]
+            heap = heaps[query_idx]
+            rows_scanned += 1
+            
+            # Earlier rows win ties; the heap keys settle them whatever the visiting order
+            floor = threshold
+            if len(heap) == limit:
+                kth_rank, kth_similarity, _ = heap[0]
+                if priority_rank < kth_rank:
+                    continue
+                if priority_rank == kth_rank:
+                    floor = max(floor, kth_similarity)
+            
+            # Check for exact substring match first
+            if error_message_lower in stored_error or stored_error in error_message_lower:
+                similarity_score = 1.0
+            elif not length_within_bounds(len(error_message_lower), len(stored_error), floor):
+                continue
+            else:
+                # Cheap upper bounds first, full similarity score only if they pass
+                matcher.set_seq1(error_message_lower)
+                if matcher.quick_ratio() < floor:
+                    continue
+                similarity_score = matcher.ratio()
+                candidates_scored += 1
+            
+            if similarity_score < threshold:
+                continue
+            key = (priority_rank, similarity_score, -row_idx)
+            if len(heap) < limit:
+                heapq.heappush(heap, key)
+            elif key > heap[0]:
+                heapq.heapreplace(heap, key)
+    
+    for query in coverage:
+        query[0] = query[1]
+    for row_idx in skipped:
+        for query_idx in row_queries[row_idx]:
+            coverage[query_idx][0] -= 1
+    # A lookup cut short found only part of the candidates; scale up the count it
+    # found so coverage stays a share of all of them
+    for query, fraction in zip(coverage, complete):
+        if fraction < 1.0:
+            query[1] = max(int(query[1] / fraction) if fraction else 0, query[1] + 1)
+    return heaps, rows_scanned, candidates_scored, coverage
+
+def shard_worker(connection):
+    """Worker process loop: keep dataset shards resident and match queries against them"""
+    shards = {}  # fingerprint -> (first row index, compiled shard)
+    while True:
+        try:
+            command, *args = connection.recv()
+        except EOFError:
+            return
+        if command == 'load':
+            fingerprint, start, columns, rows, deleted = args
+            shard = CompiledDataset(rows, columns=columns)
+            for row_idx in deleted:
+                shard.delete_row(row_idx)
+            shards[fingerprint] = (start, shard)
+            connection.send(None)
+        elif command == 'edit':
+            # Row edits of a loaded dataset; appended rows come last, in order
+            previous, fingerprint, keep, edits = args
+            start, shard = shards[previous] if keep else shards.pop(previous)
+            if keep:
+                shard = shard.copy()
+            for row_idx, row in edits:
+                if row is None:
+                    shard.delete_row(row_idx)
+                elif row_idx < len(shard):
+                    shard.update_row(row_idx, row)
+                else:
+                    shard.extend([row])
+            shards[fingerprint] = (start, shard)
+        elif command == 'drop':
+            shards.pop(args[0], None)
+        elif command == 'match':
+            fingerprint, queries, threshold, limit, category, time_budget, exhaustive = args
+            start, shard = shards[fingerprint]
+            # The remaining budget is sent rather than a deadline, as clocks differ between processes
+            deadline = time.perf_counter() + time_budget if time_budget is not None else None
+            heaps, rows_scanned, candidates_scored, coverage = top_match_keys(shard, queries, threshold, limit, category, deadline,
+                                                                              exhaustive)
+            # Shift row indexes from the shard's numbering to the dataset's
+            heaps = [[(rank, similarity_score, neg_row_idx - start) for rank, similarity_score, neg_row_idx in heap]
+                     for heap in heaps]
+            connection.send((heaps, rows_scanned, candidates_scored, coverage))
+        elif command == 'stop':
+            return
+
+class ParallelMatcher:
+    """Persistent worker processes, each holding one contiguous shard of large datasets"""
+
+    def __init__(self, workers, min_rows):
+        self.workers = workers
+        self.min_rows = min_rows
+        self.processes = []
+        self.connections = []
+        self.loaded = {}  # fingerprint -> first row index of each worker's shard
+        self.lock = threading.Lock()
+        self.pid = None
+
+    def should_handle(self, data):
+        return self.workers > 1 and len(data) >= self.min_rows
+
+    def start(self):
+        context = multiprocessing.get_context()
+        for _ in range(self.workers):
+            parent_end, child_end = context.Pipe()
+            process = context.Process(target=shard_worker, args=(child_end,), daemon=True)
+            process.start()
+            child_end.close()
+            self.processes.append(process)
+            self.connections.append(parent_end)
+        self.pid = os.getpid()
+
+    def load(self, data):
+        """Send each worker its shard of a dataset; done once per dataset"""
+        shard_size = -(-len(data) // self.workers)
+        for worker_idx, connection in enumerate(self.connections):
+            start = worker_idx * shard_size
+            deleted = [row_idx - start for row_idx in data.deleted if start <= row_idx < start + shard_size]
+            connection.send(('load', data.fingerprint, start, data.columns, data[start:start + shard_size], deleted))
+        for connection in self.connections:
+            connection.recv()
+        self.loaded[data.fingerprint] = [worker_idx * shard_size for worker_idx in range(self.workers)]
+
+    def edited(self, data, previous, changed_rows, keep):
+        """Send the edited rows to the workers holding them, so an edit does not reload every shard"""
+        with self.lock:
+            if previous not in self.loaded or self.pid != os.getpid():
+                return
+            starts = self.loaded[previous] if keep else self.loaded.pop(previous)
+            if data.fingerprint in self.loaded:
+                if not keep:
+                    self.send_all(('drop', previous))
+                return
+            # Rows appended past the end go to the last shard
+            edits = [[] for _ in self.connections]
+            for row_idx in sorted(changed_rows):
+                worker_idx = bisect.bisect_right(starts, row_idx) - 1
+                row = None if row_idx in data.deleted else data[row_idx].to_dict()
+                edits[worker_idx].append((row_idx - starts[worker_idx], row))
+            try:
+                for connection, shard_edits in zip(self.connections, edits):
+                    connection.send(('edit', previous, data.fingerprint, keep, shard_edits))
+            except OSError as e:
+                logger.warning(f"Parallel shard edit failed, shards will be reloaded: {e}")
+                self.loaded.pop(previous, None)
+                return
+            self.loaded[data.fingerprint] = starts
+
+    def send_all(self, message):
+        for connection in self.connections:
+            try:
+                connection.send(message)
+            except OSError:
+                pass
+
+    def top_match_keys(self, data, queries, threshold, limit, category=None, deadline=None, exhaustive=False):
+        """Match on every shard at once and merge the local top-k keys, or None on failure"""
+        with self.lock:
+            try:
+                # Workers do not survive a fork of this process (e.g. a pre-forking server)
+                if self.pid != os.getpid():
+                    self.processes, self.connections, self.loaded = [], [], {}
+                    self.start()
+                if data.fingerprint not in self.loaded:
+                    self.load(data)
+                time_budget = max(deadline - time.perf_counter(), 0) if deadline is not None else None
+                for connection in self.connections:
+                    connection.send(('match', data.fingerprint, queries, threshold, limit, category, time_budget, exhaustive))
+                shard_results = [connection.recv() for connection in self.connections]
+            except (OSError, EOFError) as e:
+                logger.warning(f"Parallel matching failed, falling back to one process: {e}")
+                self.shutdown()
+                return None
+        
+        heaps = [heapq.nlargest(limit, (key for shard_heaps, _, _, _ in shard_results for key in shard_heaps[query_idx]))
+                 for query_idx in range(len(queries))]
+        coverage = [[sum(result[3][query_idx][0] for result in shard_results), sum(result[3][query_idx][1] for result in shard_results)]
+                    for query_idx in range(len(queries))]
+        return (heaps, sum(result[1] for result in shard_results), sum(result[2] for result in shard_results), coverage)
+
+    def drop(self, fingerprint):
+        """Free the shards of a dataset released by the dataset store"""
+        with self.lock:
+            if fingerprint not in self.loaded or self.pid != os.getpid():
+                return
+            self.loaded.pop(fingerprint)
+            self.send_all(('drop', fingerprint))
+
+    def shutdown(self):
+        for connection in self.connections:
+            try:
+                connection.send(('stop',))
+            except OSError:
+                pass
+            connection.close()
+        for process in self.processes:
+            process.join(timeout=1)
+        self.processes, self.connections, self.loaded = [], [], {}
+        self.pid = None
+
+# Started on the first dataset of at least PARALLEL_MATCH_MIN_ROWS rows
+parallel_matcher = ParallelMatcher(app.config['PARALLEL_MATCH_WORKERS'], app.config['PARALLEL_MATCH_MIN_ROWS'])
+atexit.register(parallel_matcher.shutdown)
+
+class DifflibScorer:
+    """Default scorer: difflib ratio over the trigram shortlist, as similarity() computes it"""
+
+    name = 'difflib'
+    default_threshold = 0.6
+
+    def prepare(self, data):
+        """Build per-dataset scoring state at upload; the match index already covers difflib"""
+
+    def edited(self, data, previous, changed_rows):
+        """Carry per-dataset scoring state over an edit; other sessions may keep the previous version"""
+        parallel_matcher.edited(data, previous, changed_rows, keep=dataset_store.is_shared(previous))
+
+    def top_match_keys(self, data, queries, threshold, limit, category=None, deadline=None):
+        heaps, rows_scanned, candidates_scored, coverage = self.scan(data, queries, threshold, limit, category, deadline)
+        
+        # The trigram shortlist can miss a row that only just reaches the threshold, so a
+        # query it leaves without matches is checked against every row before it counts
+        # as unmatched; running out of time on the way leaves it partial
+        misses = [query_idx for query_idx, heap in enumerate(heaps)
+                  if not heap and coverage[query_idx][0] >= coverage[query_idx][1]
+                  and data.index.shortlists(queries[query_idx], threshold)]
+        if misses:
+            results = self.scan(data, [queries[query_idx] for query_idx in misses], threshold, limit, category, deadline, True)
+            for miss_idx, query_idx in enumerate(misses):
+                heaps[query_idx] = results[0][miss_idx]
+                coverage[query_idx] = results[3][miss_idx]
+            rows_scanned += results[1]
+            candidates_scored += results[2]
+        return heaps, rows_scanned, candidates_scored, coverage
+
+    def scan(self, data, queries, threshold, limit, category=None, deadline=None, exhaustive=False):
+        results = None
+        if parallel_matcher.should_handle(data):
+            results = parallel_matcher.top_match_keys(data, queries, threshold, limit, category, deadline, exhaustive)
+        if results is None:
+            results = top_match_keys(data, queries, threshold, limit, category, deadline, exhaustive)
+        return results
+
+class TfidfModel:
+    """Column-major (per trigram) L2-normalized TF-IDF weights of a dataset's error messages"""
+
+    def __init__(self, data):
+        import numpy as np
+        self.vocabulary = {}
+        gram_ids = array('I')
+        gram_rows = array('I')
+        for row_idx, stored_error in enumerate(data.errors_lower):
+            if row_idx in data.deleted:
+                continue
+            for gram in trigrams(stored_error):
+                gram_ids.append(self.vocabulary.setdefault(gram, len(self.vocabulary)))
+                gram_rows.append(row_idx)
+        gram_ids = np.array(gram_ids, dtype=np.uint32)
+        gram_rows = np.array(gram_rows, dtype=np.uint32)
+        
+        rows = len(data)
+        document_counts = np.bincount(gram_ids, minlength=len(self.vocabulary))
+        self.unseen_idf = np.log(1 + data.live_rows) + 1  # idf of a trigram no row has
+        self.idf = np.log((1 + data.live_rows) / (1 + document_counts)) + 1
+        weights = self.idf[gram_ids]
+        norms = np.sqrt(np.bincount(gram_rows, weights * weights, minlength=rows))
+        weights = weights / norms[gram_rows]
+        
+        # Group entries by trigram so a query gathers its grams' postings with slices
+        order = np.argsort(gram_ids, kind='stable')
+        self.rows = gram_rows[order]
+        self.weights = weights[order]
+        self.offsets = np.concatenate(([0], np.cumsum(document_counts)))
+        self.gram_counts = np.bincount(gram_rows, minlength=rows)
+        self.live = np.ones(rows, dtype=bool)
+        self.live[list(data.deleted)] = False
+        # Copies, not views: a view would stop the dataset's arrays from growing
+        self.categories = np.array(data.categories.ids, dtype=np.uint32)
+        self.priority_ranks = np.array(data.priority_ranks, dtype=np.int8)
+        self.nbytes = self.rows.nbytes + self.weights.nbytes + self.gram_counts.nbytes + self.live.nbytes + 100 * len(self.vocabulary)
+        # Rows edited since the build: their entries above are stale and the delta arrays score them instead
+        self.patched_rows = frozenset()
+        self.stale = None
+        self.extra_vocabulary = {}  # trigrams first seen in edited rows -> ids after the vocabulary's
+        self.delta_rows = self.delta_grams = np.zeros(0, dtype=np.uint32)
+        self.delta_weights = np.zeros(0)
+
+    def patched(self, data, changed_rows):
+        """Model for an edited dataset that reuses this one's arrays, or a rebuilt one once edits pile up"""
+        import numpy as np
+        patched_rows = self.patched_rows | set(changed_rows)
+        if len(patched_rows) > app.config['TFIDF_PATCH_MAX_SHARE'] * max(data.live_rows, 1):
+            return TfidfModel(data)
+        model = copy.copy(self)
+        model.patched_rows = patched_rows
+        rows = len(data)
+        grown = rows - len(self.live)
+        model.live = np.concatenate((self.live, np.ones(grown, dtype=bool)))
+        model.gram_counts = np.concatenate((self.gram_counts, np.zeros(grown, dtype=self.gram_counts.dtype)))
+        model.stale = np.concatenate((self.stale if self.stale is not None else np.zeros(len(self.live), dtype=bool),
+                                      np.zeros(grown, dtype=bool)))
+        model.categories = np.concatenate((self.categories, np.zeros(grown, dtype=np.uint32)))
+        model.priority_ranks = np.concatenate((self.priority_ranks, np.zeros(grown, dtype=np.int8)))
+        model.extra_vocabulary = dict(self.extra_vocabulary)
+        
+        # Edited rows are weighted with the idf of the build, so scores drift
+        # slightly until the next rebuild
+        delta_rows, delta_grams, delta_weights = array('I'), array('I'), array('d')
+        for row_idx in sorted(changed_rows):
+            model.stale[row_idx] = True
+            model.live[row_idx] = row_idx not in data.deleted
+            model.categories[row_idx] = data.categories.ids[row_idx]
+            model.priority_ranks[row_idx] = data.priority_ranks[row_idx]
+            grams = trigrams(data.errors_lower[row_idx]) if row_idx not in data.deleted else set()
+            model.gram_counts[row_idx] = len(grams)
+            gram_ids = [self.vocabulary[gram] if gram in self.vocabulary else
+                        model.extra_vocabulary.setdefault(gram, len(self.vocabulary) + len(model.extra_vocabulary))
+                        for gram in grams]
+            weights = np.array([self.idf[gram_id] if gram_id < len(self.idf) else self.unseen_idf for gram_id in gram_ids])
+            if len(weights):
+                weights /= np.sqrt(np.sum(weights * weights))
+            delta_rows.extend([row_idx] * len(gram_ids))
+            delta_grams.extend(gram_ids)
+            delta_weights.extend(weights.tolist())
+        # Entries of rows edited again are replaced
+        keep = slice(None)
+        if len(self.delta_rows):
+            keep = ~np.isin(self.delta_rows, np.fromiter(changed_rows, dtype=np.uint32, count=len(changed_rows)))
+        model.delta_rows = np.concatenate((self.delta_rows[keep], np.array(delta_rows, dtype=np.uint32)))
+        model.delta_grams = np.concatenate((self.delta_grams[keep], np.array(delta_grams, dtype=np.uint32)))
+        model.delta_weights = np.concatenate((self.delta_weights[keep], np.array(delta_weights)))
+        model.nbytes = (self.rows.nbytes + self.weights.nbytes + model.gram_counts.nbytes + model.live.nbytes + model.stale.nbytes
+                        + 16 * len(model.delta_rows) + 100 * (len(self.vocabulary) + len(model.extra_vocabulary)))
+        return model
+
+class TfidfScorer:
+    """Character trigram TF-IDF cosine scorer; each query is scored against all rows with NumPy"""
+
+    name = 'tfidf'
+    default_threshold = 0.5
+
+    def prepare(self, data):
+        self.model(data)
+
+    def model(self, data):
+        """Return the dataset's model, building it on first use"""
+        fingerprint, model = data.scorer_models.get(self.name, (None, None))
+        if fingerprint != data.fingerprint:
+            model = TfidfModel(data)
+            data.scorer_models[self.name] = (data.fingerprint, model)
+        return model
+
+    def edited(self, data, previous, changed_rows):
+        """Patch the model of the dataset's previous version for its edited rows"""
+        fingerprint, model = data.scorer_models.get(self.name, (None, None))
+        if fingerprint == previous:
+            data.scorer_models[self.name] = (data.fingerprint, model.patched(data, changed_rows))
+
+    def top_match_keys(self, data, queries, threshold, limit, category=None, deadline=None):
+        import numpy as np
+        model = self.model(data)
+        errors_lower = data.errors_lower
+        rows = len(data)
+        heaps = []
+        rows_scanned = 0
+        # Each query is scored over all rows at once, so the deadline is checked between queries
+        coverage = [[1, 1] for _ in queries]
+        
+        mask = model.live
+        if category is not None:
+            category_id = data.table.ids.get(category)
+            mask = mask & (model.categories == category_id) if category_id is not None else np.zeros(rows, dtype=bool)
         
-        if similarity_score >= threshold:
-            # Collect all fix columns and their data
-            fixes = []
-            priority = "Medium"  # Default priority
+        for query_idx, error_message_lower in enumerate(queries):
+            if deadline is not None and heaps and time.perf_counter() >= deadline:
+                for query in coverage[query_idx:]:
+                    query[0] = 0
+                heaps.extend([] for _ in queries[query_idx:])
+                break
+            query_grams = trigrams(error_message_lower)
+            known = [model.vocabulary[gram] for gram in query_grams if gram in model.vocabulary]
+            query_idf = model.idf[known]
+            query_norm = np.sqrt(np.sum(query_idf * query_idf) + (len(query_grams) - len(known)) * model.unseen_idf ** 2)
             
-            # Process all columns after the first one
-            for col_idx, col_name in enumerate(columns[1:], 1):
-                if col_name in row:
-                    col_value = str(row[col_name]).strip()
-                    
-                    # Skip empty/null values
-                    if col_value and col_value.lower() not in ['nan', 'none', '', 'null']:
-                        if col_name.lower() in ['priority', 'priority_level', 'urgency']:
-                            priority = col_value
-                        elif col_name.lower() in ['primary_fix', 'main_fix', 'fix', 'solution']:
-                            fixes.insert(0, {'type': 'Primary', 'content': col_value})
-                        elif col_name.lower() in ['secondary_fix', 'alternative_fix', 'alt_fix', 'alternative']:
-                            fixes.append({'type': 'Alternative', 'content': col_value})
-                        elif col_name.lower() in ['tertiary_fix', 'additional_fix', 'extra_fix']:
-                            fixes.append({'type': 'Additional', 'content': col_value})
-                        else:
-                            # Auto-detect fix type based on column position
-                            if col_idx == 1:
-                                fixes.insert(0, {'type': 'Primary', 'content': col_value})
-                            elif col_idx == 2:
-                                fixes.append({'type': 'Alternative', 'content': col_value})
-                            elif col_idx == 3:
-                                fixes.append({'type': 'Additional', 'content': col_value})
-                            elif col_idx >= 4 and col_name.lower() not in ['priority', 'priority_level', 'urgency']:
-                                fixes.append({'type': f'Option {col_idx-1}', 'content': col_value})
+            # Sparse query x column-major matrix: gather the postings of the query's trigrams
+            slices = [slice(model.offsets[gram_id], model.offsets[gram_id + 1]) for gram_id in known]
+            if slices:
+                posting_rows = np.concatenate([model.rows[posting] for posting in slices])
+                posting_weights = np.concatenate([model.weights[posting] * weight for posting, weight in zip(slices, query_idf)])
+                scores = np.bincount(posting_rows, posting_weights, minlength=rows) / query_norm
+                shared = np.bincount(posting_rows, minlength=rows)
+            else:
+                scores = np.zeros(rows)
+                shared = np.zeros(rows, dtype=np.int64)
             
-            # Ensure we have at least one fix
-            if not fixes:
-                fixes = [{'type': 'Primary', 'content': 'No specific fix provided'}]
+            extra = [model.extra_vocabulary[gram] for gram in query_grams if gram in model.extra_vocabulary]
+            if model.stale is not None and query_grams:
+                # Edited rows are scored from the delta arrays instead of their stale entries
+                scores[model.stale] = 0
+                shared[model.stale] = 0
+                query_ids = np.array(known + extra, dtype=np.uint32)
+                query_weights = np.concatenate((query_idf, np.full(len(extra), model.unseen_idf)))
+                order = np.argsort(query_ids)
+                query_ids, query_weights = query_ids[order], query_weights[order]
+                positions = np.minimum(np.searchsorted(query_ids, model.delta_grams), max(len(query_ids) - 1, 0))
+                hit = query_ids[positions] == model.delta_grams if len(query_ids) else np.zeros(len(model.delta_grams), dtype=bool)
+                scores += np.bincount(model.delta_rows[hit], model.delta_weights[hit] * query_weights[positions[hit]], minlength=rows) / query_norm
+                shared += np.bincount(model.delta_rows[hit], minlength=rows)
             
-            matches.append({
-                'error': row.get(error_col, ''),
-                'fixes': fixes,
-                'priority': priority,
-                'similarity': similarity_score
-            })
+            # Substring matches score 1.0, as with difflib; only rows sharing all
+            # trigrams of the shorter string can be one
+            possible = (model.gram_counts == shared)
+            if len(known) + len(extra) == len(query_grams):
+                possible |= (shared == len(query_grams))
+            for row_idx in np.nonzero(possible & mask)[0].tolist():
+                stored_error = errors_lower[row_idx]
+                if error_message_lower in stored_error or stored_error in error_message_lower:
+                    scores[row_idx] = 1.0
+            
+            hits = np.nonzero(mask & (scores >= threshold))[0]
+            rows_scanned += int(np.count_nonzero(shared))
+            # Priority first, then similarity, earlier rows winning ties
+            order = np.lexsort((-hits.astype(np.int64), scores[hits], model.priority_ranks[hits]))[::-1][:limit]
+            heaps.append([(int(model.priority_ranks[row_idx]), float(scores[row_idx]), -int(row_idx)) for row_idx in hits[order]])
+        return heaps, rows_scanned, rows_scanned, coverage
+
+SCORERS = {scorer.name: scorer for scorer in (DifflibScorer(), TfidfScorer())}
+
+def get_scorer(name=None):
+    """Look up a scorer by name, defaulting to the deployment's MATCH_SCORER"""
+    name = name or app.config['MATCH_SCORER']
+    if name not in SCORERS:
+        raise ValueError(f"Unknown scorer '{name}'. Available: {', '.join(SCORERS)}")
+    return SCORERS[name]
+
+def result_cache_key(data, message, category=None, scorer=None):
+    """Key of a message's cached results against a dataset"""
+    return (data.fingerprint, message.lower(), category, get_scorer(scorer).name)
+
+def find_follow_up(matches, message):
+    """Generate a follow-up question when non-exact matches are ambiguous"""
+    if matches and matches[0]['similarity'] < 0.9 and is_ambiguous_query(matches, message):
+        return generate_follow_up_question(matches, message)
+    return None
+
+def remember_follow_up(session_id, data, message, matches, follow_up):
+    """Keep the shortlist behind a follow-up question so the reply can be answered from it"""
+    storage.set_context(session_id, {
+        'fingerprint': data.fingerprint,
+        'message': message,
+        'type': follow_up['type'],
+        'shortlist': [[match['row_id'], match['similarity']] for match in matches],
+        # Only the options shown can be picked by number or name
+        'categories': [option['category'] for option in follow_up['options'][:4]] if follow_up['type'] == 'category_selection' else []
+    })
+
+def resolve_follow_up(reply, context, data):
+    """Answer a numbered or category reply to a follow-up question from its shortlist, or None for other replies"""
+    shortlist = [data.match(row_id, similarity_score) for row_id, similarity_score in context['shortlist']]
+    reply_lower = reply.lower().strip()
+    number = re.fullmatch(r'(?:option\s*)?#?(\d+)[.)]?', reply_lower)
+    choice = int(number.group(1)) - 1 if number else None
     
-    # Sort by priority first, then similarity score
-    priority_order = {'High': 3, 'Medium': 2, 'Low': 1, 'Critical': 4, 'Urgent': 4}
-    matches.sort(key=lambda x: (priority_order.get(x['priority'], 2), x['similarity']), reverse=True)
-    return matches[:5]  # Return top 5 matches
+    if context['type'] == 'category_selection':
+        categories = context['categories']
+        category = None
+        if choice is not None:
+            category = categories[choice] if 0 <= choice < len(categories) else None
+        else:
+            # "storage" or "the memory one" name a category
+            words = set(re.findall(r'[a-z]+', reply_lower))
+            category = next((category for category in categories if category in words), None)
+        if category is not None:
+            return [match for match in shortlist if match_category(match) == category]
+    elif choice is not None and 0 <= choice < min(4, len(shortlist)):
+        return [shortlist[choice]]
+    return None
+
+def refine_follow_up(reply, context, data):
+    """Keep the shortlisted errors sharing a free-text reply's new words, or None if it narrows nothing"""
+    shortlist = [data.match(row_id, similarity_score) for row_id, similarity_score in context['shortlist']]
+    reply_lower = reply.lower().strip()
+    if context['type'] == 'category_selection' and extract_keywords(reply_lower):
+        # "it's a disk problem" implies a category through its keywords
+        category = determine_error_category(extract_keywords(reply_lower))
+        if category in context['categories']:
+            return [match for match in shortlist if match_category(match) == category] or None
+    
+    # The refinement is re-scored against the original message plus the details
+    original_words = set(re.findall(r'[a-z0-9]+', context['message'].lower()))
+    words = {word for word in re.findall(r'[a-z0-9]+', reply_lower)
+             if len(word) >= 3 and word not in original_words and word not in ERROR_TERMS}
+    refined = [match for match in shortlist if words & set(re.findall(r'[a-z0-9]+', match['error'].lower()))]
+    if not refined or len(refined) == len(shortlist):
+        return None
+    details = f"{context['message']} {reply}"
+    for match in refined:
+        match['similarity'] = similarity(details, match['error'])
+    refined.sort(key=lambda match: (data.priority_ranks[match['row_id']], match['similarity']), reverse=True)
+    return refined
+
+def answer_follow_up(session_id, data, context, matches):
+    """Respond with the shortlist matches a reply selected, asking again if several remain"""
+    follow_up = generate_follow_up_question(matches, context['message']) if len(matches) > 1 else None
+    if follow_up:
+        remember_follow_up(session_id, data, context['message'], matches, follow_up)
+    else:
+        storage.set_context(session_id, None)
+    return build_follow_up_response(context, matches, follow_up)
+
+def build_follow_up_response(context, matches, follow_up):
+    """Build the /chat response for a reply resolved against a follow-up shortlist"""
+    metrics.inc('chatbot_chat_results_total', 1, 'Chat responses by match outcome', result='follow_up')
+    if len(matches) == 1:
+        return {
+            'message': 'Here are the recommended solutions for the error you selected:',
+            'exact_match': True,
+            'matches': matches,
+            'resolved_from': context['message']
+        }
+    return {
+        'message': f'Narrowed down to {len(matches)} error(s):',
+        'exact_match': False,
+        'matches': matches,
+        'follow_up': follow_up,
+        'resolved_from': context['message']
+    }
+
+def build_chat_response(message, matches, follow_up, session_id, category=None):
+    """Build the /chat response for a message from its match results"""
+    result = 'unmatched' if not matches else 'exact' if matches[0]['similarity'] >= 0.9 else 'similar'
+    metrics.inc('chatbot_chat_results_total', 1, 'Chat responses by match outcome', result=result)
+    response = build_match_response(message, matches, follow_up, session_id, category)
+    
+    # Best-so-far results of a pass cut short by the time budget
+    if getattr(matches, 'partial', False):
+        response['partial'] = True
+        response['coverage'] = round(matches.coverage, 4)
+    return response
+
+def build_match_response(message, matches, follow_up, session_id, category=None):
+    """Build the unmatched, exact or similar response body for a message"""
+    if not matches:
+        # Only a full, unfiltered search proves the error is missing from the dataset
+        if not getattr(matches, 'partial', False) and category is None:
+            log_unmatched_error(message, session_id)
+        
+        # Generate improvement suggestions
+        keywords = extract_keywords(message)
+        improvement_suggestions = generate_improvement_suggestions(message, keywords)
+        template = generate_database_entry_template(message, keywords)
+        
+        return {
+            'message': 'No matching errors found in the uploaded data.',
+            'suggestions': improvement_suggestions,
+            'unmatched': True,
+            'database_template': template
+        }
+    
+    if matches[0]['similarity'] >= 0.9:
+        return {
+            'message': f'Found exact match! Here are the recommended solutions:',
+            'exact_match': True,
+            'matches': [matches[0]]
+        }
+    
+    return {
+        'message': f'Found {len(matches)} similar error(s). Here are the closest matches:',
+        'exact_match': False,
+        'matches': matches,
+        'follow_up': follow_up
+    }
+
+def normalize_log_line(line):
+    """Collapse numbers so repeated log lines differing only in counters/timestamps group together"""
+    return re.sub(r'\d+', '#', line.lower())
+
+def sse_event(event, payload):
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+def triage_log_lines(lines, data, session_id):
+    """Diagnose the error lines of a boot log, yielding SSE events as results are found"""
+    started = time.perf_counter()
+    max_unique = app.config['TRIAGE_MAX_UNIQUE_LINES']
+    seen = {}  # normalized line -> occurrence record
+    summary = {'lines': 0, 'error_lines': 0, 'unique_errors': 0, 'matched': 0, 'unmatched': 0, 'timed_out': 0, 'skipped': 0}
+    
+    for line_number, line in enumerate(lines, 1):
+        summary['lines'] += 1
+        line = line.strip()
+        
+        # Only lines mentioning boot/hardware/error terms are worth diagnosing
+        if not line or not extract_keywords(line):
+            continue
+        summary['error_lines'] += 1
+        
+        key = normalize_log_line(line)
+        if key in seen:
+            seen[key]['count'] += 1
+            continue
+        if len(seen) >= max_unique:
+            summary['skipped'] += 1
+            continue
+        seen[key] = {'line': line, 'first_line_number': line_number, 'count': 1}
+        
+        cache_key = result_cache_key(data, line)
+        cached = result_cache.get(cache_key)
+        if cached is None:
+            matches = find_best_matches(line, data)
+            cached = (matches, find_follow_up(matches, line))
+            if not matches.partial:
+                result_cache.put(cache_key, cached)
+        matches = cached[0]
+        
+        if matches:
+            summary['matched'] += 1
+            event = {
+                'line_number': line_number,
+                'line': line,
+                'exact_match': matches[0]['similarity'] >= 0.9,
+                'matches': matches[:1] if matches[0]['similarity'] >= 0.9 else matches
+            }
+            if getattr(matches, 'partial', False):
+                event['coverage'] = round(matches.coverage, 4)
+            yield sse_event('match', event)
+        else:
+            event = {'line_number': line_number, 'line': line}
+            if getattr(matches, 'partial', False):
+                # The budget ran out before the whole catalog was searched; this is not a known miss
+                summary['timed_out'] += 1
+                event['partial'] = True
+                event['coverage'] = round(matches.coverage, 4)
+            else:
+                summary['unmatched'] += 1
+                log_unmatched_error(line, session_id, {'source': 'log_triage', 'line_number': line_number})
+            yield sse_event('unmatched', event)
+    
+    summary['unique_errors'] = len(seen)
+    summary['seconds'] = round(time.perf_counter() - started, 4)
+    summary['repeated'] = sorted(
+        (record for record in seen.values() if record['count'] > 1),
+        key=lambda record: record['count'],
+        reverse=True
+    )[:20]
+    yield sse_event('summary', summary)
+
+metrics.gauges.append(lambda: [
+    ('chatbot_resident_datasets', 'Compiled datasets held by this process', len(dataset_store.datasets)),
+    ('chatbot_resident_dataset_bytes', 'Estimated bytes of resident datasets', dataset_store.resident_bytes()),
+    ('chatbot_sessions', 'Sessions attached to a dataset in this process', len(dataset_store.sessions)),
+    ('chatbot_result_cache_entries', 'Entries in the match result cache', len(result_cache.entries)),
+    ('chatbot_result_cache_hits', 'Result cache hits since start', result_cache.hits),
+    ('chatbot_result_cache_misses', 'Result cache misses since start', result_cache.misses),
+    ('chatbot_unmatched_queue_depth', 'Unmatched errors waiting for the background writer', unmatched_writer.queue.qsize()),
+    ('chatbot_unmatched_dropped', 'Unmatched errors dropped because the writer queue was full', unmatched_writer.dropped)
+])
+
+@app.before_request
+def start_server_timing():
+    if metrics.enabled and (app.config['SERVER_TIMING'] or request.headers.get('X-Server-Timing')):
+        g.server_timing = []
+        g.request_started = time.perf_counter()
+
+@app.after_request
+def add_server_timing(response):
+    if 'server_timing' in g:
+        entries = [f'{stage};dur={seconds * 1000:.3f}' for stage, seconds in g.server_timing]
+        entries.append(f'total;dur={(time.perf_counter() - g.request_started) * 1000:.3f}')
+        response.headers['Server-Timing'] = ', '.join(entries)
+    return response
+
+def cached_result_unaffected(key, value, data, changed_rows, new_rows, threshold=DifflibScorer.default_threshold, limit=5):
+    """Check that an edit leaves a cached result as is: none of its rows changed and no new row ranks in it"""
+    matches = value[0]
+    if any(match.get('row_id') is None or match['row_id'] in changed_rows for match in matches):
+        return False
+    
+    _, query, category, scorer = key
+    if scorer != DifflibScorer.name:
+        return False
+    worst = (data.priority_ranks[matches[-1]['row_id']], matches[-1]['similarity']) if len(matches) >= limit else None
+    matcher = SequenceMatcher(None)
+    matcher.set_seq1(query)
+    for row_idx in new_rows:
+        if category is not None and data.categories[row_idx] != category:
+            continue
+        stored_error = data.errors_lower[row_idx]
+        floor = threshold
+        if worst is not None:
+            if data.priority_ranks[row_idx] < worst[0]:
+                continue
+            if data.priority_ranks[row_idx] == worst[0]:
+                floor = max(floor, worst[1])
+        if query in stored_error or stored_error in query:
+            return False
+        if not length_within_bounds(len(query), len(stored_error), floor):
+            continue
+        matcher.set_seq2(stored_error)
+        if matcher.quick_ratio() >= floor and matcher.ratio() >= floor:
+            return False
+    return True
+
+def scalar_cells(row):
+    """Whether every cell of a JSON row holds a value a CSV/Excel cell could"""
+    return all(value is None or isinstance(value, (str, int, float, bool)) for value in row.values())
+
+def edit_session_dataset(session_id, data, appended=(), updated=None, deleted=()):
+    """Apply row edits to a session's dataset, returning the edited dataset"""
+    updated = updated or {}
+    previous = data.fingerprint
+    # Other sessions keep the version they uploaded
+    if dataset_store.is_shared(previous):
+        data = data.copy()
+    
+    first_new = len(data)
+    for row_idx, row in updated.items():
+        data.update_row(row_idx, row)
+    for row_idx in deleted:
+        data.delete_row(row_idx)
+    data.extend(appended)
+    
+    # Keep cached results the edit cannot have changed
+    changed_rows = set(updated) | set(deleted)
+    new_rows = [row_idx for row_idx in updated if row_idx not in data.deleted] + list(range(first_new, len(data)))
+    result_cache.migrate(previous, data.fingerprint,
+                         lambda key, value: cached_result_unaffected(key, value, data, changed_rows, new_rows))
+    # Scoring state follows the changed rows rather than being rebuilt for the new fingerprint
+    changed_rows |= set(range(first_new, len(data)))
+    for scorer in SCORERS.values():
+        scorer.edited(data, previous, changed_rows)
+    
+    return storage.save_dataset_edit(session_id, previous, data, changed_rows)
 
 @app.route('/')
 def index():
@@ -388,14 +2882,23 @@ def upload_file():
             if len(columns) < 2:
                 return jsonify({'error': 'File must have at least 2 columns (Error Message and at least one Fix column)'}), 400
             
-            # Store the data
-            uploaded_data[session_id] = data
+            # Invalidate results cached against the session's previous upload
+            previous = storage.dataset_fingerprint(session_id)
+            if previous is not None:
+                result_cache.invalidate(previous)
+            
+            # Store the compiled data so /chat only does the scoring work,
+            # sharing one copy between sessions that upload the same content
+            ingest_stats = data.ingest_stats
+            data = storage.save_dataset(session_id, data)
+            get_scorer().prepare(data)
             
             return jsonify({
                 'success': True, 
                 'message': f'File uploaded successfully! Found {len(data)} error records.',
                 'columns': list(columns),
-                'sample_data': data[:3] if len(data) >= 3 else data
+                'sample_data': data[:3],
+                'ingest': ingest_stats
             })
             
         except Exception as e:
@@ -403,73 +2906,331 @@ def upload_file():
     
     return jsonify({'error': 'Invalid file type. Please upload CSV, XLS, or XLSX files.'}), 400
 
+@app.route('/catalogs', methods=['GET'])
+def list_catalogs():
+    """List the preloaded catalogs sessions can attach to"""
+    return jsonify({'catalogs': [
+        {'name': name, 'rows': dataset.live_rows, 'columns': dataset.columns,
+         'loaded_from': dataset.catalog['loaded_from'], 'load_seconds': dataset.catalog['seconds']}
+        for name, dataset in catalogs.items()
+    ]})
+
+@app.route('/catalogs/<name>/attach', methods=['POST'])
+def attach_catalog(name):
+    """Use a preloaded catalog for this session instead of uploading a file"""
+    dataset = catalogs.get(name)
+    if dataset is None:
+        return jsonify({'error': f"Unknown catalog '{name}'"}), 404
+    
+    if 'session_id' not in session:
+        session['session_id'] = str(uuid.uuid4())
+    session_id = session['session_id']
+    
+    previous = storage.dataset_fingerprint(session_id)
+    if previous is not None and previous != dataset.fingerprint:
+        result_cache.invalidate(previous)
+    data = storage.save_dataset(session_id, dataset)
+    get_scorer().prepare(data)
+    
+    return jsonify({
+        'success': True,
+        'message': f'Catalog loaded! Found {data.live_rows} error records.',
+        'catalog': name,
+        'columns': data.columns,
+        'sample_data': data[:3]
+    })
+
+def load_session_dataset():
+    """Return (session id, dataset) of the current session, or (None, None) without an upload"""
+    session_id = session.get('session_id')
+    data = storage.load_dataset(session_id) if session_id else None
+    return (session_id, data) if data is not None else (None, None)
+
+def live_row_id(data, row_id):
+    return 0 <= row_id < len(data) and row_id not in data.deleted
+
+@app.route('/dataset/rows', methods=['GET'])
+def list_dataset_rows():
+    """List the rows of the session's dataset with the ids used to edit them"""
+    session_id, data = load_session_dataset()
+    if data is None:
+        return jsonify({'error': 'Please upload a file first'}), 400
+    
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', 50, type=int), 0), 1000)
+    row_ids = islice((row_idx for row_idx in range(offset, len(data)) if row_idx not in data.deleted), limit)
+    return jsonify({
+        'rows': [{'row_id': row_idx, 'cells': data[row_idx].to_dict()} for row_idx in row_ids],
+        'total': data.live_rows,
+        'columns': data.columns
+    })
+
+@app.route('/dataset/rows', methods=['POST'])
+def append_dataset_rows():
+    """Append rows, as JSON {"rows": [...]} or a small CSV/Excel file, to the session's dataset"""
+    session_id, data = load_session_dataset()
+    if data is None:
+        return jsonify({'error': 'Please upload a file first'}), 400
+    
+    if 'file' in request.files:
+        file = request.files['file']
+        if not allowed_file(file.filename):
+            return jsonify({'error': 'Invalid file type. Please upload CSV, XLS, or XLSX files.'}), 400
+        try:
+            delta, _ = read_file_data(file)
+        except Exception as e:
+            return jsonify({'error': f'Error processing file: {str(e)}'}), 400
+        rows = delta[:]
+    else:
+        rows = (request.get_json(silent=True) or {}).get('rows')
+    
+    if not isinstance(rows, list) or not rows or not all(isinstance(row, dict) for row in rows):
+        return jsonify({'error': 'Please provide a non-empty list of rows'}), 400
+    if not all(scalar_cells(row) for row in rows):
+        return jsonify({'error': 'Cell values must be text, numbers, booleans or null'}), 400
+    if len(rows) > app.config['DATASET_EDIT_MAX_ROWS']:
+        return jsonify({'error': f"At most {app.config['DATASET_EDIT_MAX_ROWS']} rows are accepted per request"}), 400
+    unknown = list(dict.fromkeys(col_name for row in rows for col_name in row if col_name not in data.column_index))
+    if unknown:
+        return jsonify({'error': f"Unknown columns: {', '.join(map(str, unknown))}"}), 400
+    if any(not str(row.get(data.error_col) or '').strip() for row in rows):
+        return jsonify({'error': f"Every row needs a value for '{data.error_col}'"}), 400
+    
+    first_new = len(data)
+    data = edit_session_dataset(session_id, data, appended=rows)
+    return jsonify({
+        'success': True,
+        'message': f'Added {len(rows)} error records.',
+        'row_ids': list(range(first_new, first_new + len(rows))),
+        'total': data.live_rows
+    })
+
+@app.route('/dataset/rows/<int:row_id>', methods=['PATCH'])
+def update_dataset_row(row_id):
+    """Change some cells of one row of the session's dataset"""
+    session_id, data = load_session_dataset()
+    if data is None:
+        return jsonify({'error': 'Please upload a file first'}), 400
+    if not live_row_id(data, row_id):
+        return jsonify({'error': f'Row {row_id} not found'}), 404
+    
+    changes = (request.get_json(silent=True) or {}).get('cells')
+    if not isinstance(changes, dict) or not changes:
+        return jsonify({'error': 'Please provide the cells to change'}), 400
+    if not scalar_cells(changes):
+        return jsonify({'error': 'Cell values must be text, numbers, booleans or null'}), 400
+    unknown = [col_name for col_name in changes if col_name not in data.column_index]
+    if unknown:
+        return jsonify({'error': f"Unknown columns: {', '.join(map(str, unknown))}"}), 400
+    
+    row = data[row_id].to_dict()
+    row.update(changes)
+    if not str(row.get(data.error_col) or '').strip():
+        return jsonify({'error': f"Every row needs a value for '{data.error_col}'"}), 400
+    
+    data = edit_session_dataset(session_id, data, updated={row_id: row})
+    return jsonify({'success': True, 'row_id': row_id, 'cells': data[row_id].to_dict()})
+
+@app.route('/dataset/rows/<int:row_id>', methods=['DELETE'])
+def delete_dataset_row(row_id):
+    """Remove one row from the session's dataset"""
+    session_id, data = load_session_dataset()
+    if data is None:
+        return jsonify({'error': 'Please upload a file first'}), 400
+    if not live_row_id(data, row_id):
+        return jsonify({'error': f'Row {row_id} not found'}), 404
+    
+    data = edit_session_dataset(session_id, data, deleted=[row_id])
+    return jsonify({'success': True, 'row_id': row_id, 'total': data.live_rows})
+
+def valid_time_budget(time_budget):
+    return time_budget is None or (type(time_budget) in (int, float) and time_budget > 0)
+
 @app.route('/chat', methods=['POST'])
 def chat():
     request_data = request.get_json()
     message = request_data.get('message', '').strip()
+    category = request_data.get('category') or None  # Optional pre-filter, e.g. 'storage'
+    scorer = request_data.get('scorer') or None  # Optional override of MATCH_SCORER
+    time_budget = request_data.get('time_budget')  # Optional seconds, capped by MATCH_TIME_BUDGET
     
     if not message:
         return jsonify({'error': 'Please enter an error message'}), 400
+    if category is not None and category not in error_categories():
+        return jsonify({'error': f"Unknown category '{category}'. Available: {', '.join(error_categories())}"}), 400
+    if scorer is not None and (not isinstance(scorer, str) or scorer not in SCORERS):
+        return jsonify({'error': f"Unknown scorer '{scorer}'. Available: {', '.join(SCORERS)}"}), 400
+    if not valid_time_budget(time_budget):
+        return jsonify({'error': 'time_budget must be a positive number of seconds'}), 400
     
     session_id = session.get('session_id')
-    if not session_id or session_id not in uploaded_data:
+    data = storage.load_dataset(session_id) if session_id else None
+    if data is None:
         return jsonify({'error': 'Please upload a file first'}), 400
     
-    data = uploaded_data[session_id]
+    # Answer replies to a follow-up question from its shortlist instead of searching again
+    context = storage.get_context(session_id)
+    if context is not None and context.get('fingerprint') != data.fingerprint:
+        context = None
+    if context is not None and category is None and scorer is None and not request_data.get('new_query'):
+        # Numbers and category names select from the shortlist; other details narrow it down
+        matches = resolve_follow_up(message, context, data) or refine_follow_up(message, context, data)
+        if matches:
+            return jsonify(answer_follow_up(session_id, data, context, matches))
+        # A reply narrowing nothing is searched as a new error
     
-    # Find matching errors
-    matches = find_best_matches(message, data)
+    # Reuse results for queries already answered against the same dataset
+    cache_key = result_cache_key(data, message, category, scorer)
+    cached = result_cache.get(cache_key)
+    if cached is None:
+        # Find matching errors
+        matches = find_best_matches(message, data, category=category, scorer=scorer, time_budget=time_budget)
+        cached = (matches, find_follow_up(matches, message))
+        # Partial results would hide the full answer from later requests
+        if not matches.partial:
+            result_cache.put(cache_key, cached)
     
-    if not matches:
-        # Log unmatched error for dataset improvement
-        log_unmatched_error(message, session_id)
-        
-        # Generate improvement suggestions
-        improvement_suggestions = generate_improvement_suggestions(message)
-        template = generate_database_entry_template(message)
-        
-        response = {
-            'message': 'No matching errors found in the uploaded data.',
-            'suggestions': improvement_suggestions,
-            'unmatched': True,
-            'database_template': template
-        }
-    else:
-        if matches[0]['similarity'] >= 0.9:
-            response = {
-                'message': f'Found exact match! Here are the recommended solutions:',
-                'exact_match': True,
-                'matches': [matches[0]]
-            }
+    response = build_chat_response(message, *cached, session_id, category)
+    if response.get('follow_up'):
+        remember_follow_up(session_id, data, message, *cached)
+    elif context is not None:
+        storage.set_context(session_id, None)
+    return jsonify(response)
+
+@app.route('/chat/batch', methods=['POST'])
+def chat_batch():
+    """Match a list of error messages against the dataset in one request"""
+    started = time.perf_counter()
+    request_data = request.get_json(silent=True) or {}
+    messages = request_data.get('messages')
+    scorer = request_data.get('scorer') or None
+    time_budget = request_data.get('time_budget')  # For the whole batch
+    
+    if not isinstance(messages, list) or not messages:
+        return jsonify({'error': 'Please provide a non-empty list of error messages'}), 400
+    if scorer is not None and (not isinstance(scorer, str) or scorer not in SCORERS):
+        return jsonify({'error': f"Unknown scorer '{scorer}'. Available: {', '.join(SCORERS)}"}), 400
+    if len(messages) > app.config['BATCH_MAX_MESSAGES']:
+        return jsonify({'error': f"At most {app.config['BATCH_MAX_MESSAGES']} messages are accepted per batch"}), 400
+    if not valid_time_budget(time_budget):
+        return jsonify({'error': 'time_budget must be a positive number of seconds'}), 400
+    
+    session_id = session.get('session_id')
+    data = storage.load_dataset(session_id) if session_id else None
+    if data is None:
+        return jsonify({'error': 'Please upload a file first'}), 400
+    
+    messages = [str(message).strip() if message is not None else '' for message in messages]
+    
+    # Look up each distinct query once, collecting cache misses for one shared pass
+    results = {}
+    pending = []
+    cache_hits = 0
+    for message in messages:
+        cache_key = result_cache_key(data, message, scorer=scorer)
+        if not message or cache_key in results:
+            continue
+        cached = result_cache.get(cache_key)
+        if cached is None:
+            results[cache_key] = None
+            pending.append(message)
         else:
-            # Check if query is ambiguous and needs follow-up
-            follow_up = None
-            if is_ambiguous_query(matches, message):
-                follow_up = generate_follow_up_question(matches, message)
-            
-            response = {
-                'message': f'Found {len(matches)} similar error(s). Here are the closest matches:',
-                'exact_match': False,
-                'matches': matches,
-                'follow_up': follow_up
-            }
+            results[cache_key] = cached
+            cache_hits += 1
     
-    return jsonify(response)
+    for message, matches in zip(pending, find_best_matches_batch(pending, data, scorer=scorer, time_budget=time_budget)):
+        cache_key = result_cache_key(data, message, scorer=scorer)
+        results[cache_key] = (matches, find_follow_up(matches, message))
+        if not matches.partial:
+            result_cache.put(cache_key, results[cache_key])
+    
+    responses = []
+    summary = {'total': len(messages), 'exact': 0, 'similar': 0, 'unmatched': 0, 'timed_out': 0, 'invalid': 0, 'partial': 0}
+    for message in messages:
+        if not message:
+            responses.append({'error': 'Please enter an error message'})
+            summary['invalid'] += 1
+            continue
+        response = build_chat_response(message, *results[result_cache_key(data, message, scorer=scorer)], session_id)
+        summary['partial'] += response.get('partial', False)
+        if response.get('unmatched'):
+            # A miss is only known once the whole dataset was searched
+            summary['timed_out' if response.get('partial') else 'unmatched'] += 1
+        elif response['exact_match']:
+            summary['exact'] += 1
+        else:
+            summary['similar'] += 1
+        responses.append(response)
+    
+    summary['unique_messages'] = len(results)
+    summary['cache_hits'] = cache_hits
+    summary['seconds'] = round(time.perf_counter() - started, 4)
+    
+    return jsonify({'results': responses, 'summary': summary})
+
+@app.route('/triage-log', methods=['POST'])
+def triage_log():
+    """Stream diagnoses for a raw boot console log as Server-Sent Events"""
+    if 'file' not in request.files or request.files['file'].filename == '':
+        return jsonify({'error': 'No log file selected'}), 400
+    
+    session_id = session.get('session_id')
+    data = storage.load_dataset(session_id) if session_id else None
+    if data is None:
+        return jsonify({'error': 'Please upload a file first'}), 400
+    
+    # The upload is closed when the view returns, so stream from a private copy
+    log_file = tempfile.TemporaryFile()
+    shutil.copyfileobj(request.files['file'].stream, log_file)
+    log_file.seek(0)
+    
+    def generate():
+        with log_file:
+            yield from triage_log_lines(iter_text_lines(log_file, errors='replace'), data, session_id)
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
 @app.route('/clear', methods=['POST'])
 def clear_session():
     session_id = session.get('session_id')
-    if session_id and session_id in uploaded_data:
-        del uploaded_data[session_id]
+    if session_id:
+        fingerprint = storage.dataset_fingerprint(session_id)
+        if fingerprint is not None:
+            result_cache.invalidate(fingerprint)
+            storage.release_dataset(session_id)
+        storage.set_context(session_id, None)
     session.clear()
     return jsonify({'success': True, 'message': 'Session cleared successfully'})
 
+@app.route('/cache-stats', methods=['GET'])
+def get_cache_stats():
+    """Get hit/miss/eviction counters of the match result cache"""
+    return jsonify(result_cache.stats())
+
+@app.route('/dataset-stats', methods=['GET'])
+def get_dataset_stats():
+    """Get resident datasets, their memory use and eviction counters"""
+    return jsonify(storage.stats())
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Expose stage latencies, counters and gauges in Prometheus text format"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/unmatched-errors', methods=['GET'])
 def get_unmatched_errors():
-    """Get list of unmatched errors for dataset improvement"""
+    """Get the most frequent unmatched errors for dataset improvement"""
+    stats = storage.unmatched_stats()
     return jsonify({
-        'unmatched_errors': unmatched_errors[-20:],  # Return last 20 unmatched errors
-        'total_count': len(unmatched_errors)
+        'unmatched_errors': storage.top_unmatched(20),  # Return the 20 most frequent unmatched errors
+        'recent': storage.recent_unmatched(20),
+        'total_count': stats['total_count'],
+        'distinct_count': stats['distinct_count'],
+        'dropped_count': unmatched_writer.dropped
     })
 
 @app.route('/download-unmatched', methods=['GET'])
@@ -480,16 +3241,20 @@ def download_unmatched_errors():
         writer = csv.writer(output)
         
         # Write header
-        writer.writerow(['Timestamp', 'Error Message', 'Suggested Primary Fix', 'Suggested Alternative Fix', 'Priority'])
+        writer.writerow(['Error Message', 'Suggested Primary Fix', 'Suggested Alternative Fix', 'Priority',
+                         'Occurrences', 'Sessions', 'First Seen', 'Last Seen'])
         
-        # Write unmatched errors with suggested template
-        for error_entry in unmatched_errors:
+        # Write one row per distinct unmatched error with suggested template
+        for group in storage.top_unmatched():
             writer.writerow([
-                error_entry['timestamp'],
-                error_entry['error_message'],
+                group['error_message'],
                 '[Please provide the main solution for this error]',
                 '[Optional: Provide an alternative solution]',
-                'Medium'
+                'Medium',
+                group['count'],
+                group['session_count'],
+                group['first_seen'],
+                group['last_seen']
             ])
         
         output.seek(0)
@@ -503,5 +3268,7 @@ def download_unmatched_errors():
     except Exception as e:
         return jsonify({'error': f'Error generating download: {str(e)}'}), 400
 
+preload_catalogs()
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
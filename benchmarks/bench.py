@@ -0,0 +1,225 @@
+"""Benchmark and load-test suite for the bootcode chatbot.
+
+Times the matching pipeline stages on synthetic catalogs of several sizes
+and runs a multi-client load test against the Flask app. Results are
+written as JSON so runs can be compared across commits.
+
+Usage: python benchmarks/bench.py [--sizes 1000 10000 100000] [--queries 200]
+                                  [--clients 8] [--duration 10] [--load-rows 10000]
+                                  [--no-cache] [--output bench_results.json]
+"""
+import argparse
+import http.client
+import io
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from werkzeug.datastructures import FileStorage
+from werkzeug.serving import make_server
+
+import app as chatbot
+from synthetic import synthetic_catalog, synthetic_queries
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(seconds):
+    """Latency summary in milliseconds"""
+    seconds = sorted(seconds)
+    if not seconds:
+        return {'count': 0}
+    return {
+        'count': len(seconds),
+        'mean_ms': round(1000 * sum(seconds) / len(seconds), 4),
+        'p50_ms': round(1000 * percentile(seconds, 0.50), 4),
+        'p95_ms': round(1000 * percentile(seconds, 0.95), 4),
+        'p99_ms': round(1000 * percentile(seconds, 0.99), 4),
+        'max_ms': round(1000 * seconds[-1], 4)
+    }
+
+
+def timed(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+
+def bench_functions(rows, query_count):
+    """Time each pipeline stage against one catalog size"""
+    payload = synthetic_catalog(rows).encode('utf-8')
+    upload = FileStorage(io.BytesIO(payload), filename='catalog.csv')
+    (dataset, _), read_seconds = timed(chatbot.read_file_data, upload)
+
+    stages = {'find_best_matches': [], 'is_ambiguous_query': [], 'generate_follow_up_question': []}
+    matched = 0
+    for query in synthetic_queries(query_count):
+        matches, seconds = timed(chatbot.find_best_matches, query, dataset)
+        stages['find_best_matches'].append(seconds)
+        if matches:
+            matched += 1
+            _, seconds = timed(chatbot.is_ambiguous_query, matches, query)
+            stages['is_ambiguous_query'].append(seconds)
+            _, seconds = timed(chatbot.generate_follow_up_question, matches, query)
+            stages['generate_follow_up_question'].append(seconds)
+
+    return {
+        'rows': rows,
+        'file_bytes': len(payload),
+        'read_file_data': {
+            'seconds': round(read_seconds, 4),
+            'rows_per_sec': round(rows / read_seconds) if read_seconds else None
+        },
+        'dataset_bytes': dataset.nbytes,
+        'queries': query_count,
+        'matched_queries': matched,
+        'stages': {stage: summarize(seconds) for stage, seconds in stages.items()}
+    }
+
+
+def multipart_body(filename, payload):
+    boundary = uuid.uuid4().hex
+    body = (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        'Content-Type: text/csv\r\n\r\n'
+    ).encode('utf-8') + payload + f'\r\n--{boundary}--\r\n'.encode('utf-8')
+    return body, f'multipart/form-data; boundary={boundary}'
+
+
+def run_client(port, payload, queries, deadline, latencies, errors, client_idx):
+    """One simulated user: upload the catalog, then chat until the deadline"""
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    body, content_type = multipart_body('catalog.csv', payload)
+    conn.request('POST', '/upload', body=body, headers={'Content-Type': content_type})
+    response = conn.getresponse()
+    response.read()
+    cookie = response.getheader('Set-Cookie', '').split(';', 1)[0]
+    if response.status != 200:
+        errors.append(f'upload failed with status {response.status}')
+        return
+
+    query_idx = client_idx
+    while time.perf_counter() < deadline:
+        message = json.dumps({'message': queries[query_idx % len(queries)]})
+        query_idx += 1
+        started = time.perf_counter()
+        conn.request('POST', '/chat', body=message, headers={'Content-Type': 'application/json', 'Cookie': cookie})
+        response = conn.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - started)
+        if response.status != 200:
+            errors.append(f'chat failed with status {response.status}')
+    conn.close()
+
+
+def run_load_test(rows, clients, duration, query_count):
+    """Drive the app with concurrent sessions and report latency and throughput"""
+    server = make_server('127.0.0.1', 0, chatbot.app, threaded=True)
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+
+    payload = synthetic_catalog(rows).encode('utf-8')
+    queries = synthetic_queries(query_count, seed=2)
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    threads = [
+        threading.Thread(target=run_client, args=(server.port, payload, queries, deadline, latencies, errors, client_idx))
+        for client_idx in range(clients)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+
+    return {
+        'rows': rows,
+        'clients': clients,
+        'duration_seconds': round(elapsed, 3),
+        'requests': len(latencies),
+        'errors': len(errors),
+        'throughput_rps': round(len(latencies) / elapsed, 2) if elapsed else None,
+        'latency': summarize(latencies),
+        'peak_rss_bytes': chatbot.peak_rss_bytes()
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='catalog sizes (rows) for the per-stage timings, up to 1000000')
+    parser.add_argument('--queries', type=int, default=200, help='queries timed per catalog size')
+    parser.add_argument('--clients', type=int, default=8, help='concurrent sessions in the load test (0 to skip)')
+    parser.add_argument('--duration', type=float, default=10, help='load test duration in seconds')
+    parser.add_argument('--load-rows', type=int, default=10000, help='catalog size used by the load test')
+    parser.add_argument('--no-cache', action='store_true', help='disable the match result cache during the load test')
+    parser.add_argument('--output', default='bench_results.json', help='where to write the JSON results')
+    args = parser.parse_args()
+
+    if args.no_cache:
+        chatbot.result_cache.max_entries = 0
+
+    # Request logging would dominate the load test's I/O
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+    results = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'result_cache': not args.no_cache
+        },
+        'functions': [],
+        'load_test': None
+    }
+
+    for rows in args.sizes:
+        result = bench_functions(rows, args.queries)
+        results['functions'].append(result)
+        find = result['stages']['find_best_matches']
+        print(f"{rows:>9} rows: read {result['read_file_data']['seconds']:.3f}s "
+              f"({result['read_file_data']['rows_per_sec']} rows/s), "
+              f"find_best_matches p50 {find['p50_ms']:.3f}ms p95 {find['p95_ms']:.3f}ms")
+
+    if args.clients > 0:
+        load = run_load_test(args.load_rows, args.clients, args.duration, args.queries)
+        results['load_test'] = load
+        latency = load['latency']
+        print(f"load test: {load['clients']} clients, {load['throughput_rps']} req/s, "
+              f"p50 {latency.get('p50_ms')}ms p95 {latency.get('p95_ms')}ms p99 {latency.get('p99_ms')}ms, "
+              f"{load['errors']} errors, peak RSS {load['peak_rss_bytes']}")
+
+    with open(args.output, 'w') as output:
+        json.dump(results, output, indent=2)
+    print(f"results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
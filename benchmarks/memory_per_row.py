@@ -0,0 +1,53 @@
+"""Measure the resident bytes per row of an uploaded error catalog.
+
+Generates a synthetic catalog modeled on sample_bootcode_errors.csv and
+compares the plain list-of-dicts the CSV reader produces with the
+CompiledDataset kept by the app for the same rows.
+
+Usage: python benchmarks/memory_per_row.py [rows]
+"""
+import csv
+import gc
+import io
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import app as chatbot
+from synthetic import synthetic_catalog
+
+
+def measure(build):
+    """Return (object, bytes still allocated after build)"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, current
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    text = synthetic_catalog(rows)
+
+    _, dict_bytes = measure(lambda: list(csv.DictReader(io.StringIO(text))))
+    _, index_bytes = measure(lambda: chatbot.MatchIndex(row['Error Message'].lower() for row in csv.DictReader(io.StringIO(text))))
+
+    def build_dataset():
+        dataset = chatbot.CompiledDataset(columns=next(csv.reader(io.StringIO(text))))
+        dataset.extend(csv.DictReader(io.StringIO(text)))
+        return dataset
+
+    dataset, dataset_bytes = measure(build_dataset)
+    print(f"rows: {rows}")
+    print(f"list of dicts:    {dict_bytes / rows:8.1f} bytes/row")
+    print(f"CompiledDataset:  {dataset_bytes / rows:8.1f} bytes/row, of which match index {index_bytes / rows:.1f}")
+    print(f"estimated nbytes: {dataset.nbytes / rows:8.1f} bytes/row")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Measure the speedup of sharded multi-process matching on a large catalog.
+
+Compiles one synthetic catalog, then times the same queries with matching
+in one process and across worker pools of increasing size. Every parallel
+run is checked against the single-process results.
+
+Usage: python benchmarks/parallel.py [--rows 400000] [--queries 50]
+                                     [--workers 2 4 8] [--output bench_parallel.json]
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import app as chatbot
+from synthetic import synthetic_catalog, synthetic_queries
+
+
+def time_queries(dataset, queries):
+    """Match queries one at a time, as /chat does; return (results, seconds)"""
+    started = time.perf_counter()
+    results = [chatbot.find_best_matches(query, dataset) for query in queries]
+    return results, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, default=400000, help='catalog size in rows')
+    parser.add_argument('--queries', type=int, default=50, help='queries timed per configuration')
+    parser.add_argument('--workers', type=int, nargs='+', default=[2, 4, 8], help='worker pool sizes to time')
+    parser.add_argument('--output', default='bench_parallel.json', help='where to write the JSON results')
+    args = parser.parse_args()
+
+    text = synthetic_catalog(args.rows)
+    dataset = chatbot.CompiledDataset(columns=next(csv.reader(io.StringIO(text))))
+    dataset.extend(csv.DictReader(io.StringIO(text)))
+    queries = synthetic_queries(args.queries)
+
+    # Time complete passes only, so every run can be compared with the single-process results
+    chatbot.app.config['MATCH_TIME_BUDGET'] = None
+    chatbot.parallel_matcher.workers = 1
+    expected, serial_seconds = time_queries(dataset, queries)
+    print(f"rows: {args.rows}, queries: {args.queries}, cpu_count: {os.cpu_count()}")
+    print(f"1 process:  {serial_seconds:8.3f}s")
+
+    runs = [{'workers': 1, 'seconds': round(serial_seconds, 4), 'speedup': 1.0, 'identical': True}]
+    chatbot.parallel_matcher.min_rows = 0
+    for workers in args.workers:
+        chatbot.parallel_matcher.shutdown()
+        chatbot.parallel_matcher.workers = workers
+
+        # The first query starts the pool and ships the shards; time steady state only
+        load_started = time.perf_counter()
+        chatbot.find_best_matches(queries[0], dataset)
+        load_seconds = time.perf_counter() - load_started
+
+        results, seconds = time_queries(dataset, queries)
+        runs.append({
+            'workers': workers,
+            'seconds': round(seconds, 4),
+            'speedup': round(serial_seconds / seconds, 2),
+            'identical': results == expected,
+            'startup_seconds': round(load_seconds, 4)
+        })
+        print(f"{workers} workers: {seconds:8.3f}s  speedup {serial_seconds / seconds:5.2f}x  "
+              f"startup {load_seconds:.2f}s  identical {results == expected}")
+    chatbot.parallel_matcher.shutdown()
+
+    with open(args.output, 'w') as output:
+        json.dump({'rows': args.rows, 'queries': args.queries, 'cpu_count': os.cpu_count(), 'runs': runs}, output, indent=2)
+    print(f"results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
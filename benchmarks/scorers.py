@@ -0,0 +1,107 @@
+"""Compare the match scorers on accuracy and speed.
+
+Accuracy: every error of sample_bootcode_errors.csv is turned into queries
+(exact, lower-cased, reordered words, typos, a dropped word, extra log
+context) whose correct answer is known, and each scorer is graded on
+top-1 and top-5 hits. Speed: each scorer answers the same queries against
+a synthetic catalog, with the TF-IDF model build timed separately.
+
+Usage: python benchmarks/scorers.py [--rows 100000] [--queries 200] [--output bench_scorers.json]
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import app as chatbot
+from synthetic import SAMPLE_PATH, load_sample, mutate, synthetic_catalog, synthetic_queries
+
+
+def labelled_queries(seed=2):
+    """Yield (kind, query, expected error) for every sample error"""
+    rng = random.Random(seed)
+    for error, _ in load_sample():
+        words = error.split()
+        reordered = words[:]
+        while len(words) > 1 and reordered == words:
+            rng.shuffle(reordered)
+        yield 'exact', error, error
+        yield 'lower case', error.lower(), error
+        yield 'reordered', ' '.join(reordered), error
+        yield 'typos', mutate(error, rng, 2), error
+        if len(words) > 2:
+            dropped = words[:]
+            del dropped[rng.randrange(len(dropped))]
+            yield 'dropped word', ' '.join(dropped), error
+        yield 'log context', f"[    2.{rng.randint(100000, 999999)}] stage 2: {error} (code 0x{rng.randint(0, 0xffff):04x})", error
+
+
+def grade(dataset, scorer):
+    """Top-1 and top-5 hit rates per query kind"""
+    results = {}
+    for kind, query, expected in labelled_queries():
+        matches = chatbot.find_best_matches(query, dataset, scorer=scorer)
+        errors = [match['error'] for match in matches]
+        result = results.setdefault(kind, {'queries': 0, 'top1': 0, 'top5': 0})
+        result['queries'] += 1
+        result['top1'] += bool(errors) and errors[0] == expected
+        result['top5'] += expected in errors
+    total = {key: sum(result[key] for result in results.values()) for key in ('queries', 'top1', 'top5')}
+    results['all'] = total
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, default=100000, help='synthetic catalog size for the speed comparison')
+    parser.add_argument('--queries', type=int, default=200, help='queries timed per scorer')
+    parser.add_argument('--output', default='bench_scorers.json', help='where to write the JSON results')
+    args = parser.parse_args()
+
+    with open(SAMPLE_PATH, newline='', encoding='utf-8') as sample:
+        reader = csv.DictReader(sample)
+        sample_dataset = chatbot.CompiledDataset(reader, columns=reader.fieldnames)
+
+    results = {'accuracy': {}, 'speed': {'rows': args.rows, 'queries': args.queries}}
+    print('accuracy on the sample catalog (top-1 / top-5 hits):')
+    for scorer in chatbot.SCORERS:
+        accuracy = grade(sample_dataset, scorer)
+        results['accuracy'][scorer] = accuracy
+        print(f"  {scorer:8} " + '  '.join(f"{kind} {result['top1']}/{result['top5']}/{result['queries']}"
+                                         for kind, result in accuracy.items()))
+
+    text = synthetic_catalog(args.rows)
+    dataset = chatbot.CompiledDataset(columns=next(csv.reader(io.StringIO(text))))
+    dataset.extend(csv.DictReader(io.StringIO(text)))
+    queries = synthetic_queries(args.queries)
+
+    print(f"speed on {args.rows} rows, {args.queries} queries:")
+    for name, scorer in chatbot.SCORERS.items():
+        started = time.perf_counter()
+        scorer.prepare(dataset)
+        prepare_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for query in queries:
+            chatbot.find_best_matches(query, dataset, scorer=name)
+        seconds = time.perf_counter() - started
+        results['speed'][name] = {
+            'prepare_seconds': round(prepare_seconds, 4),
+            'seconds': round(seconds, 4),
+            'mean_ms': round(1000 * seconds / len(queries), 4)
+        }
+        print(f"  {name:8} prepare {prepare_seconds:.3f}s, {1000 * seconds / len(queries):.3f} ms/query")
+
+    with open(args.output, 'w') as output:
+        json.dump(results, output, indent=2)
+    print(f"results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Synthetic bootcode error catalogs and queries for benchmarks.
+
+Rows are variations of the errors and fixes in sample_bootcode_errors.csv,
+so catalogs of any size keep the vocabulary and shape of real data.
+"""
+import csv
+import io
+import os
+import random
+
+SAMPLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sample_bootcode_errors.csv')
+
+COLUMNS = ['Error Message', 'Primary Fix', 'Alternative Fix', 'Priority']
+STAGES = ['', 'Stage 1:', 'Stage 2:', 'POST:', 'Bootloader:', 'Secure boot:', 'Recovery:', 'PXE:']
+DETAILS = ['', 'on cold boot', 'after warm reset', 'on slot {n}', 'at address 0x{n:06X}', 'in partition {n}']
+PRIORITIES = ['Critical', 'High', 'Medium', 'Medium', 'Low']
+UNRELATED = ['printer out of paper', 'network share unavailable', 'license key expired', 'fan speed nominal']
+
+
+def load_sample():
+    """Return the (error, fix) pairs of the sample catalog"""
+    with open(SAMPLE_PATH, newline='', encoding='utf-8') as sample:
+        reader = csv.reader(sample)
+        next(reader)
+        return [(row[0], row[1]) for row in reader if row]
+
+
+def synthetic_rows(rows, seed=0):
+    """Yield catalog rows as dicts keyed by COLUMNS"""
+    rng = random.Random(seed)
+    sample = load_sample()
+    for row_idx in range(rows):
+        error, fix = rng.choice(sample)
+        stage = rng.choice(STAGES)
+        detail = rng.choice(DETAILS).format(n=row_idx)
+        yield {
+            'Error Message': ' '.join(part for part in (stage, error, detail) if part),
+            'Primary Fix': fix,
+            'Alternative Fix': rng.choice(sample)[1],
+            'Priority': rng.choice(PRIORITIES)
+        }
+
+
+def synthetic_catalog(rows, seed=0):
+    """Return CSV text for a catalog with the given number of rows"""
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=COLUMNS)
+    writer.writeheader()
+    writer.writerows(synthetic_rows(rows, seed))
+    return output.getvalue()
+
+
+def mutate(text, rng, edits):
+    """Apply a few character substitutions, like a hand-typed error message"""
+    chars = list(text)
+    for _ in range(edits):
+        if chars:
+            chars[rng.randrange(len(chars))] = rng.choice('abcdefghijklmnopqrstuvwxyz ')
+    return ''.join(chars)
+
+
+def synthetic_queries(count, seed=1):
+    """Return a mix of exact, misspelled, reordered, generic and unrelated queries"""
+    rng = random.Random(seed)
+    errors = [error for error, _ in load_sample()]
+    queries = []
+    for query_idx in range(count):
+        error = rng.choice(errors)
+        kind = query_idx % 5
+        if kind == 0:
+            queries.append(error)
+        elif kind == 1:
+            queries.append(mutate(error, rng, rng.randint(1, 3)))
+        elif kind == 2:
+            words = error.split()
+            rng.shuffle(words)
+            queries.append(' '.join(words))
+        elif kind == 3:
+            queries.append(rng.choice(error.split()))
+        else:
+            queries.append(rng.choice(UNRELATED))
+    return queries
@@ -0,0 +1,63 @@
+"""Compiled catalog artifacts: reuse, and recompiling when one is unreadable."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import app as chatbot
+
+MESSAGES = ['boot sector checksum mismatch', 'memory test failed', 'disk read timeout', 'secure boot signature invalid']
+PRIORITIES = ['Critical', 'High', 'Medium', 'Low']
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    path = tmp_path / 'boot.csv'
+    lines = ['Error Message,Fix Details,Priority'] + [
+        f'{MESSAGES[row_idx % 4]} at 0x{row_idx:05X},fix {row_idx},{PRIORITIES[row_idx % 3]}' for row_idx in range(200)
+    ]
+    path.write_text('\n'.join(lines) + '\n')
+    return str(path), str(tmp_path / '.compiled')
+
+
+def artifact_path(artifact_dir):
+    return os.path.join(artifact_dir, f'boot.v{chatbot.CATALOG_ARTIFACT_VERSION}.catalog')
+
+
+def test_artifact_is_reused(catalog):
+    path, artifact_dir = catalog
+    os.makedirs(artifact_dir)
+    _, compiled = chatbot.load_catalog(path, artifact_dir)
+    _, mapped = chatbot.load_catalog(path, artifact_dir)
+    assert (compiled.catalog['loaded_from'], mapped.catalog['loaded_from']) == ('source', 'artifact')
+    assert mapped.fingerprint == compiled.fingerprint
+
+
+@pytest.mark.parametrize('damage', [
+    lambda content: b'',
+    lambda content: content[:14],
+    lambda content: content[:60],
+    lambda content: content[:-16],
+    lambda content: content[:-13],
+    lambda content: content[:16] + b'{' * 40 + content[56:],
+])
+def test_unreadable_artifact_is_recompiled(catalog, damage):
+    path, artifact_dir = catalog
+    os.makedirs(artifact_dir)
+    _, compiled = chatbot.load_catalog(path, artifact_dir)
+    with open(artifact_path(artifact_dir), 'rb') as artifact:
+        content = artifact.read()
+    # Replaced rather than rewritten, as the compiled catalog still maps the old file
+    with open(artifact_path(artifact_dir) + '.damaged', 'wb') as artifact:
+        artifact.write(damage(content))
+    os.replace(artifact_path(artifact_dir) + '.damaged', artifact_path(artifact_dir))
+
+    _, reloaded = chatbot.load_catalog(path, artifact_dir)
+    assert reloaded.catalog['loaded_from'] == 'source'
+    assert reloaded.fingerprint == compiled.fingerprint
+    query = compiled.errors_lower[0]
+    assert chatbot.find_best_matches(query, reloaded) == chatbot.find_best_matches(query, compiled)
+    with open(artifact_path(artifact_dir), 'rb') as artifact:
+        assert artifact.read() == content
@@ -0,0 +1,133 @@
+"""Row edits: delta storage in SQLite, patched TF-IDF models and the shared value table."""
+import io
+import os
+import random
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import app as chatbot
+from test_matching import generated_catalog, generated_queries
+
+
+def random_edit(data, rng, texts):
+    """One append, update or delete of live rows, as edit_session_dataset takes it"""
+    live = [row_idx for row_idx in range(len(data)) if row_idx not in data.deleted]
+    kind = rng.choice(['append', 'update', 'delete'])
+    if kind == 'append':
+        return {'appended': [{'Error Message': rng.choice(texts), 'Priority': 'High'} for _ in range(rng.randint(1, 3))]}
+    if kind == 'update':
+        return {'updated': {rng.choice(live): {'Error Message': rng.choice(texts), 'Priority': 'Critical'}}}
+    return {'deleted': [rng.choice(live)]}
+
+
+def rows_of(data):
+    return [None if row_idx in data.deleted else row.to_dict() for row_idx, row in enumerate(data)]
+
+
+@pytest.fixture
+def sqlite_storage(tmp_path, monkeypatch):
+    store = chatbot.DatasetStore(3600, 512 * 1024 * 1024)
+    backend = chatbot.SQLiteBackend(str(tmp_path / 'chatbot.db'), store, 3600)
+    monkeypatch.setattr(chatbot, 'dataset_store', store)
+    monkeypatch.setattr(chatbot, 'storage', backend)
+    return backend
+
+
+def test_sqlite_edits_store_changed_rows_only(sqlite_storage):
+    rng = random.Random(0)
+    data = chatbot.CompiledDataset(generated_catalog(2000))
+    texts = [row['Error Message'] for row in generated_catalog(50, seed=9)]
+    sqlite_storage.save_dataset('s1', data)
+    sqlite_storage.save_dataset('s2', data)
+    conn = sqlite_storage.connection()
+    changed = set()
+    for _ in range(30):
+        edit = random_edit(data, rng, texts)
+        first_new = len(data)
+        data = chatbot.edit_session_dataset('s1', data, **edit)
+        changed |= set(edit.get('updated', ())) | set(edit.get('deleted', ())) | set(range(first_new, len(data)))
+        rows_key = conn.execute('SELECT rows_key FROM datasets WHERE fingerprint = ?', (data.fingerprint,)).fetchone()[0]
+        stored = conn.execute('SELECT COUNT(*) FROM dataset_rows WHERE fingerprint = ?', (rows_key,)).fetchone()[0]
+        assert stored == len(changed)
+
+    # Versions no session uses are folded away; s2 keeps the upload
+    assert conn.execute('SELECT COUNT(*) FROM datasets').fetchone()[0] == 2
+    expected = rows_of(data)
+    sqlite_storage.store.detach('s1')
+    sqlite_storage.store.detach('s2')
+    hydrated = sqlite_storage.load_dataset('s1')
+    assert hydrated is not data
+    assert rows_of(hydrated) == expected
+
+    query = data.errors_lower[next(row_idx for row_idx in reversed(range(len(data))) if row_idx not in data.deleted)]
+    assert chatbot.find_best_matches(query, hydrated) == chatbot.find_best_matches(query, data)
+
+
+def test_fts_lookup_matches_memory_index(sqlite_storage):
+    if not sqlite_storage.fts_enabled:
+        pytest.skip('SQLite lacks the FTS5 trigram tokenizer')
+    # Every row ends in " error", so its trigrams must not select candidates
+    data = chatbot.CompiledDataset(generated_catalog(3000, suffix=' error'))
+    sqlite_storage.save_dataset('s1', data)
+    sqlite_storage.store.detach('s1')
+    hydrated = sqlite_storage.load_dataset('s1')
+    assert isinstance(hydrated.index, chatbot.FTSMatchIndex)
+    for query in generated_queries(data, 40):
+        assert hydrated.index.candidates(query.lower(), 0.6) == data.index.candidates(query.lower(), 0.6), query
+    assert hydrated.index.gram_frequencies({'err', 'zzz'}) == {'err': len(data)}
+
+
+def test_patched_tfidf_model_ranks_like_a_rebuild():
+    pytest.importorskip('numpy')
+    rng = random.Random(1)
+    scorer = chatbot.SCORERS['tfidf']
+    data = chatbot.CompiledDataset(generated_catalog(3000))
+    texts = [row['Error Message'] for row in generated_catalog(200, seed=7)]
+    queries = generated_queries(data, 100)
+    scorer.prepare(data)
+    for _ in range(20):
+        data = chatbot.edit_session_dataset('edits', data, **random_edit(data, rng, texts))
+    chatbot.dataset_store.detach('edits')
+
+    fingerprint, model = data.scorer_models[scorer.name]
+    assert fingerprint == data.fingerprint and model.patched_rows
+    patched = scorer.top_match_keys(data, queries, 0.3, 1)[0]
+    data.scorer_models[scorer.name] = (data.fingerprint, chatbot.TfidfModel(data))
+    rebuilt = scorer.top_match_keys(data, queries, 0.3, 1)[0]
+    # Edited rows keep the idf of the build, so only scores near a tie may swap
+    agree = sum(1 for a, b in zip(patched, rebuilt) if [key[2] for key in a] == [key[2] for key in b])
+    assert agree >= 0.95 * len(queries)
+
+
+def test_value_table_add_from_threads():
+    table = chatbot.ValueTable()
+    values = [f'value {value_idx % 500}' for value_idx in range(4000)]
+    ids = [[] for _ in range(8)]
+
+    def add(thread_idx):
+        ids[thread_idx] = [table.add(value) for value in values[thread_idx::8]]
+
+    threads = [threading.Thread(target=add, args=(thread_idx,)) for thread_idx in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for thread_idx in range(8):
+        assert [table.values[value_id] for value_id in ids[thread_idx]] == values[thread_idx::8]
+    assert len(table.values) == 501
+
+
+def test_append_rejects_unknown_columns(sqlite_storage):
+    client = chatbot.app.test_client()
+    catalog = 'Error Message,Primary Fix\nUSB port timeout,Reseat the cable\n'
+    client.post('/upload', data={'file': (io.BytesIO(catalog.encode()), 'catalog.csv')},
+                content_type='multipart/form-data')
+    response = client.post('/dataset/rows', json={'rows': [{'Error Message': 'Fan failure', 'Fix': 'Replace it'}]})
+    assert response.status_code == 400
+    assert 'Fix' in response.get_json()['error']
+    rows = client.get('/dataset/rows?offset=0&limit=5').get_json()
+    assert [row['cells']['Error Message'] for row in rows['rows']] == ['USB port timeout']
@@ -0,0 +1,85 @@
+"""Replies to follow-up questions: shortlist selections versus new searches."""
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import app as chatbot
+
+CATALOG = """Error Message,Primary Fix,Priority
+USB port timeout,Reseat the cable,Medium
+USB port reset failed,Update the hub firmware,Medium
+USB port power fault,Check the power supply,Medium
+PCIe link training failed,Reseat the card,Medium
+PCIe bus reset timeout,Reseat the card,Medium
+"""
+
+
+@pytest.fixture
+def client():
+    client = chatbot.app.test_client()
+    response = client.post('/upload', data={'file': (io.BytesIO(CATALOG.encode()), 'catalog.csv')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200
+    return client
+
+
+def ask_follow_up(client):
+    """Leave a specific-selection question over the three USB port rows pending"""
+    with client.session_transaction() as flask_session:
+        session_id = flask_session['session_id']
+    data = chatbot.storage.load_dataset(session_id)
+    matches = [data.match(row_idx, 0.7) for row_idx in range(3)]
+    chatbot.remember_follow_up(session_id, data, 'usb prot problem', matches,
+                               chatbot.generate_follow_up_question(matches, 'usb prot problem'))
+
+
+def test_numbered_reply_selects_from_shortlist(client):
+    ask_follow_up(client)
+    result = client.post('/chat', json={'message': '2'}).get_json()
+    assert result['resolved_from'] == 'usb prot problem'
+    assert [match['error'] for match in result['matches']] == ['USB port reset failed']
+
+
+def test_new_error_outside_shortlist_is_searched(client):
+    ask_follow_up(client)
+    result = client.post('/chat', json={'message': 'PCIe bus timeout'}).get_json()
+    assert 'resolved_from' not in result
+    assert result['matches'][0]['error'] == 'PCIe bus reset timeout'
+
+
+def test_details_refine_shortlist_without_search(client, monkeypatch):
+    ask_follow_up(client)
+    monkeypatch.setattr(chatbot, 'find_best_matches', None)
+    result = client.post('/chat', json={'message': 'it says reset'}).get_json()
+    assert result['resolved_from'] == 'usb prot problem'
+    assert [match['error'] for match in result['matches']] == ['USB port reset failed']
+
+
+def test_new_query_skips_shortlist(client):
+    ask_follow_up(client)
+    result = client.post('/chat', json={'message': '2', 'new_query': True}).get_json()
+    assert 'resolved_from' not in result
+
+
+@pytest.mark.parametrize('category', [['storage'], 'Storage', 'nonsense'])
+def test_unknown_category_is_rejected(client, category):
+    response = client.post('/chat', json={'message': 'USB port timeout', 'category': category})
+    assert response.status_code == 400
+
+
+def test_category_filter_miss_is_not_logged(client, monkeypatch):
+    logged = []
+    monkeypatch.setattr(chatbot, 'log_unmatched_error', lambda *args, **kwargs: logged.append(args))
+    result = client.post('/chat', json={'message': 'USB port timeout', 'category': 'memory'}).get_json()
+    assert result['unmatched'] and not logged
+
+
+@pytest.mark.parametrize('path, body', [('/chat', {'message': 'USB port timeout'}),
+                                        ('/chat/batch', {'messages': ['USB port timeout']})])
+def test_non_string_scorer_is_rejected(client, path, body):
+    response = client.post(path, json=dict(body, scorer=['tfidf']))
+    assert response.status_code == 400
@@ -0,0 +1,41 @@
+"""Regression tests for the single-pass keyword matcher against the original per-term scan."""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import app as chatbot
+
+TERMS = chatbot.BOOT_TERMS + chatbot.HARDWARE_TERMS + chatbot.ERROR_TERMS
+FILLER = ['the', 'at', 'on', 'x', '0x1F', 'Stage 2:', '-', '', 'sector', 'port', 'code']
+
+
+def per_term_keywords(text):
+    """Keyword extraction as it was before the single-pass matcher: one substring test per term"""
+    text_lower = text.lower()
+    return [term for term in TERMS if term in text_lower]
+
+
+def generated_texts(count, seed=0):
+    """Terms glued together, split, cased and mixed with filler, so terms overlap and nest"""
+    rng = random.Random(seed)
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(0, 6)):
+            term = rng.choice(TERMS + FILLER)
+            if rng.random() < 0.2 and len(term) > 2:
+                cut = rng.randrange(1, len(term))
+                term = term[:cut] + rng.choice(['', ' ', term[cut - 1]]) + term[cut:]
+            parts.append(term.upper() if rng.random() < 0.2 else term)
+        yield rng.choice(['', ' ', '_']).join(parts)
+
+
+def test_extract_keywords_matches_per_term_scan():
+    for text in generated_texts(5000):
+        assert chatbot.extract_keywords(text) == per_term_keywords(text), text
+
+
+def test_extract_keywords_on_nested_terms():
+    for text in ['bootmgr', 'BOOTLOADER failed', 'secureboot ramdisk', 'failedfailure', 'ntldrgrubgpt', 'missingmbr']:
+        assert chatbot.extract_keywords(text) == per_term_keywords(text), text
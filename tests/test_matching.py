@@ -0,0 +1,184 @@
+"""Regression tests for matching against an exhaustive, brute-force scan."""
+import os
+import random
+import sys
+from difflib import SequenceMatcher
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import app as chatbot
+
+WORDS = ['boot', 'sector', 'checksum', 'mismatch', 'memory', 'test', 'failed', 'disk', 'read', 'timeout',
+         'secure', 'signature', 'invalid', 'partition', 'table', 'missing', 'bootmgr', 'kernel', 'panic',
+         'controller', 'port', 'tpm', 'measurement', 'uefi', 'variable', 'corrupt', 'grub', 'rescue']
+PRIORITIES = ['Critical', 'High', 'Medium', 'Low']
+
+
+def generated_catalog(rows, seed=0, suffix=''):
+    """Rows of a few random words, some repeated with a detail so rows come in families"""
+    rng = random.Random(seed)
+    families = [' '.join(rng.sample(WORDS, rng.randint(2, 5))) for _ in range(max(rows // 20, 1))]
+    return [{
+        'Error Message': f"{rng.choice(families)} {rng.choice(['', f'on port {row_idx}', f'at 0x{row_idx:05X}'])}".strip() + suffix,
+        'Fix Details': f'fix {row_idx}',
+        'Priority': rng.choice(PRIORITIES)
+    } for row_idx in range(rows)]
+
+
+def mutate(text, rng, edits):
+    chars = list(text)
+    for _ in range(edits):
+        chars[rng.randrange(len(chars))] = rng.choice('abcdefghijklmnopqrstuvwxyz _')
+    return ''.join(chars)
+
+
+def generated_queries(data, count, seed=1):
+    """Misspelled rows, word subsets, reordered rows and unrelated text"""
+    rng = random.Random(seed)
+    queries = []
+    for query_idx in range(count):
+        error = data.errors_lower[rng.randrange(len(data))]
+        words = error.split()
+        kind = query_idx % 4
+        if kind == 0:
+            queries.append(mutate(error, rng, rng.randint(1, 3)))
+        elif kind == 1:
+            queries.append(' '.join(words[:rng.randint(1, len(words))]))
+        elif kind == 2:
+            rng.shuffle(words)
+            queries.append(' '.join(words))
+        else:
+            queries.append(' '.join(rng.sample(WORDS, 3)))
+    return queries
+
+
+def exhaustive_matches(data, query, threshold=0.6, limit=5):
+    """(row, similarity) of the top matches when every row is scored, as the original scan did"""
+    query = query.lower()
+    keys = []
+    for row_idx, stored_error in enumerate(data.errors_lower):
+        if row_idx in data.deleted:
+            continue
+        if query in stored_error or stored_error in query:
+            score = 1.0
+        else:
+            score = SequenceMatcher(None, query, stored_error).ratio()
+        if score >= threshold:
+            keys.append((data.priority_ranks[row_idx], score, -row_idx))
+    return [(-neg_row_idx, score) for _, score, neg_row_idx in sorted(keys, reverse=True)[:limit]]
+
+
+def found_matches(data, query):
+    return [(match['row_id'], match['similarity']) for match in chatbot.find_best_matches(query, data)]
+
+
+@pytest.fixture(autouse=True)
+def no_time_budget():
+    budget = chatbot.app.config['MATCH_TIME_BUDGET']
+    chatbot.app.config['MATCH_TIME_BUDGET'] = None
+    yield
+    chatbot.app.config['MATCH_TIME_BUDGET'] = budget
+
+
+def test_small_catalogs_score_every_row():
+    data = chatbot.CompiledDataset([{'Error Message': 'ab cd ef', 'Fix Details': 'fix'},
+                                    {'Error Message': 'unrelated text', 'Fix Details': 'fix'}])
+    # No trigram in common, but difflib still rates it 0.75
+    assert found_matches(data, 'ab_cd_ef') == [(0, 0.75)]
+
+
+def test_small_catalogs_match_exhaustive_scan():
+    data = chatbot.CompiledDataset(generated_catalog(600))
+    for query in generated_queries(data, 80):
+        assert found_matches(data, query) == exhaustive_matches(data, query), query
+
+
+@pytest.mark.parametrize('rows', [1001, 4000])
+def test_shortlist_agrees_with_exhaustive_scan(rows):
+    data = chatbot.CompiledDataset(generated_catalog(rows))
+    assert len(data) > chatbot.app.config['MATCH_EXHAUSTIVE_MAX_ROWS']
+    queries = generated_queries(data, 120)
+    same_top = 0
+    for query in queries:
+        found = found_matches(data, query)
+        expected = exhaustive_matches(data, query)
+        # The shortlist may miss rows, but never scores a row differently
+        # and never leaves a message without matches the full scan finds
+        scores = dict(exhaustive_matches(data, query, limit=len(data)))
+        assert all(scores.get(row_idx) == score for row_idx, score in found), query
+        assert bool(found) == bool(expected), query
+        same_top += found[:1] == expected[:1]
+    assert same_top >= 0.99 * len(queries)
+
+
+def test_rows_outside_shortlist_are_found_before_a_miss():
+    rows = generated_catalog(2000) + [{'Error Message': 'ab cd ef', 'Fix Details': 'fix', 'Priority': 'Low'}]
+    data = chatbot.CompiledDataset(rows)
+    # No trigram in common with the only row that reaches the threshold
+    assert len(data) - 1 not in data.index.candidates('ab_cd_ef', 0.6)
+    assert found_matches(data, 'ab_cd_ef') == exhaustive_matches(data, 'ab_cd_ef') == [(len(data) - 1, 0.75)]
+
+
+def test_frequent_trigrams_do_not_select_candidates():
+    # Every row ends in " error", so "err", "rro" and "ror" are in every row
+    data = chatbot.CompiledDataset(generated_catalog(4000, suffix=' error'))
+    queries = generated_queries(data, 40)
+    shortlisted = sum(len(data.index.candidates(query.lower(), 0.6)) for query in queries)
+    assert shortlisted < 0.2 * len(data) * len(queries)
+
+
+def test_heap_scan_matches_brute_force(monkeypatch):
+    # Duplicate rows and few priorities make ties that must go to the earlier row
+    rows = generated_catalog(300, seed=3)
+    rows += [dict(row, **{'Fix Details': 'duplicate'}) for row in rows[::7]]
+    data = chatbot.CompiledDataset(rows)
+    monkeypatch.setitem(chatbot.app.config, 'MATCH_EXHAUSTIVE_MAX_ROWS', len(data))
+    queries = generated_queries(data, 60, seed=4)
+    for threshold in (0.3, 0.6, 0.9):
+        for limit in (1, 5, 20):
+            for query in queries:
+                found = [(match['row_id'], match['similarity'])
+                         for match in chatbot.find_best_matches(query, data, threshold=threshold, limit=limit)]
+                assert found == exhaustive_matches(data, query, threshold, limit), (query, threshold, limit)
+
+
+def test_batch_scan_matches_single_queries(monkeypatch):
+    data = chatbot.CompiledDataset(generated_catalog(300, seed=5))
+    monkeypatch.setitem(chatbot.app.config, 'MATCH_EXHAUSTIVE_MAX_ROWS', len(data))
+    queries = generated_queries(data, 40, seed=6)
+    batch = chatbot.find_best_matches_batch(queries, data)
+    assert [[(match['row_id'], match['similarity']) for match in matches] for matches in batch] == \
+        [exhaustive_matches(data, query) for query in queries]
+
+
+def test_expired_deadline_cuts_candidate_lookup_short():
+    data = chatbot.CompiledDataset(generated_catalog(20000, seed=8))
+    query = data.errors_lower[0]
+    full = data.index.candidates(query, 0.6)
+    assert full.complete == 1.0
+    # A deadline already past still walks the first chunk, then stops
+    cut = data.index.candidates(query, 0.6, deadline=0)
+    assert cut.complete < 1.0
+    assert set(cut) <= set(full)
+    matches = chatbot.find_best_matches(query, data, time_budget=1e-9)
+    assert matches.partial and matches.coverage < 1.0
+
+
+def test_triage_does_not_log_partial_misses(monkeypatch):
+    data = chatbot.CompiledDataset(generated_catalog(300, seed=9))
+    logged = []
+    monkeypatch.setattr(chatbot, 'log_unmatched_error', lambda *args, **kwargs: logged.append(args))
+    monkeypatch.setattr(chatbot, 'find_best_matches', lambda line, data: chatbot.MatchResults([], 0.25))
+    events = list(chatbot.triage_log_lines(['kernel panic: unknown boot device'], data, 'triage'))
+    assert 'event: unmatched' in events[0] and '"partial": true' in events[0] and '"coverage": 0.25' in events[0]
+    assert '"unmatched": 0' in events[1] and '"timed_out": 1' in events[1]
+    assert not logged
+
+
+def test_global_budget_caps_each_batch_message(monkeypatch):
+    monkeypatch.setitem(chatbot.app.config, 'MATCH_TIME_BUDGET', 2.0)
+    monkeypatch.setattr(chatbot.time, 'perf_counter', lambda: 100.0)
+    assert chatbot.match_deadline(None, 1500) == 100.0 + 3000.0
+    assert chatbot.match_deadline(5.0, 1500) == 105.0